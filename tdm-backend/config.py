@@ -30,6 +30,23 @@ class Settings(BaseSettings):
 
     # Dataset store: local path when MinIO not used
     dataset_store_path: str = ""
+    # Parquet codec for written datasets (zstd, snappy, lz4, gzip, none); the level applies to codecs that take one
+    parquet_codec: str = "zstd"
+    parquet_compression_level: int = 1
+    # Faker values pre-generated per kind (email, name, ...) and sampled for synthetic string columns
+    synthetic_pool_size: int = 4096
+
+    # Crawl schema cache (SQLite, keyed by URLs + hints); ttl <= 0 disables it
+    crawl_cache_path: str = ""
+    crawl_cache_ttl_seconds: int = 86400
+
+    # PII LLM label cache (SQLite, keyed by column name + data type); ttl <= 0 disables it
+    pii_llm_cache_path: str = ""
+    pii_llm_cache_ttl_seconds: int = 604800
+
+    # Redis (optional) - idempotency keys for /workflow/execute; empty disables the guard
+    redis_url: str = ""
+    idempotency_ttl_seconds: int = 600
 
     class Config:
         env_file = _env_file
@@ -49,6 +66,12 @@ class Settings(BaseSettings):
         if not self.dataset_store_path:
             base = Path(__file__).resolve().parent
             self.dataset_store_path = str(base / "data" / "datasets")
+        if not self.crawl_cache_path:
+            base = Path(__file__).resolve().parent
+            self.crawl_cache_path = str(base / "data" / "crawl_cache.sqlite")
+        if not self.pii_llm_cache_path:
+            base = Path(__file__).resolve().parent
+            self.pii_llm_cache_path = str(base / "data" / "pii_label_cache.sqlite")
 
 
 settings = Settings()
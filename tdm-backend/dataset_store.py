@@ -1,8 +1,12 @@
 """Local filesystem dataset store. Path: {dataset_store_path}/{version_id}/{table_name}.parquet"""
 import os
 from pathlib import Path
+import pyarrow as pa
 from config import settings
 
+# Rows per parquet row group; tables are written from one contiguous chunk per column
+PARQUET_ROW_GROUP_SIZE = 65_536
+
 
 def get_dataset_dir(version_id: str) -> Path:
     base = Path(settings.dataset_store_path)
@@ -20,6 +24,20 @@ def ensure_dataset_dir(version_id: str) -> Path:
     return d
 
 
+def parquet_write_options() -> dict:
+    """pq.write_table keyword arguments for dataset files: configured codec, dictionary encoding, v2 data pages.
+    Column statistics stay on; quality checks and masking read them."""
+    options = {
+        "compression": settings.parquet_codec,
+        "use_dictionary": True,
+        "data_page_version": "2.0",
+        "row_group_size": PARQUET_ROW_GROUP_SIZE,
+    }
+    if settings.parquet_codec.lower() != "none" and pa.Codec.supports_compression_level(settings.parquet_codec):
+        options["compression_level"] = settings.parquet_compression_level
+    return options
+
+
 def list_tables(version_id: str) -> list[str]:
     d = get_dataset_dir(version_id)
     if not d.exists():
@@ -124,7 +124,7 @@ class Job(Base):
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     finished_at = Column(DateTime(timezone=True))
     user_id = Column(String(255))
-    logs = relationship("JobLog", back_populates="job", cascade="all, delete-orphan")
+    logs = relationship("JobLog", back_populates="job", cascade="all, delete-orphan", order_by="JobLog.created_at")
 
 
 class JobLog(Base):
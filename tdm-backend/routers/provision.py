@@ -9,8 +9,8 @@ from config import settings
 router = APIRouter()
 
 
-def _run_provision_task(job_id: str, dataset_version_id: str, target_env: str, reset_env: bool, run_smoke_tests: bool):
-    run_provision(dataset_version_id=dataset_version_id, target_env=target_env, reset_env=reset_env, run_smoke_tests=run_smoke_tests, job_id=job_id)
+def _run_provision_task(job_id: str, dataset_version_id: str, target_env: str, reset_env: bool, run_smoke_tests: bool, parallelism: int):
+    run_provision(dataset_version_id=dataset_version_id, target_env=target_env, reset_env=reset_env, run_smoke_tests=run_smoke_tests, job_id=job_id, parallelism=parallelism)
 
 
 @router.post("/provision", response_model=ProvisionResponse)
@@ -29,6 +29,7 @@ def post_provision(body: ProvisionRequest, background_tasks: BackgroundTasks):
         body.target_env,
         body.reset_env,
         body.run_smoke_tests,
+        body.parallelism,
     )
     return ProvisionResponse(job_id=job_id, status="pending", message="Provision job started")
 
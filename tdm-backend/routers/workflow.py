@@ -3,18 +3,90 @@ Workflow API Router
 Unified workflow endpoint that orchestrates all TDM operations
 """
 
-from fastapi import APIRouter, Depends, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, BackgroundTasks, Header, HTTPException, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload
 from typing import Dict, List, Optional, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
+import json
 import logging
+import tempfile
+import uuid
+from datetime import datetime
+from pathlib import Path
 
+from config import settings
 from database import get_db, SessionLocal
 from services.workflow_orchestrator import execute_workflow
 
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
 logger = logging.getLogger("tdm.api")
 router = APIRouter(prefix="/workflow", tags=["Workflow Orchestration"])
 
+_IDEMPOTENCY_PREFIX = "tdm:idem:"
+# Fail fast when Redis is unreachable; the idempotency guard is skipped rather than stalling requests
+_REDIS_SOCKET_TIMEOUT_SECONDS = 0.5
+# Inline test_case_content cap; larger inputs go through /workflow/execute-with-upload
+MAX_TEST_CASE_CONTENT_LENGTH = 1_048_576
+_UPLOAD_CHUNK_SIZE = 64 * 1024
+_redis_client = None
+
+
+def _now_iso() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def _get_redis():
+    """Lazily create a shared Redis client; None when Redis is not configured or not installed."""
+    global _redis_client
+    if _redis_client is None and settings.redis_url:
+        if not REDIS_AVAILABLE:
+            logger.warning("REDIS_URL is set but redis is not installed. Install with: pip install redis")
+            return None
+        _redis_client = redis.Redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_connect_timeout=_REDIS_SOCKET_TIMEOUT_SECONDS,
+            socket_timeout=_REDIS_SOCKET_TIMEOUT_SECONDS,
+        )
+    return _redis_client
+
+
+def _claim_idempotency_key(idem_key: str, entry: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """
+    Atomically store entry under idem_key (SET NX EX).
+    Returns None if the key was claimed, or the entry stored by the earlier request.
+    Redis errors disable the guard for this request rather than failing it.
+    """
+    client = _get_redis()
+    if client is None:
+        return None
+    key = _IDEMPOTENCY_PREFIX + idem_key
+    try:
+        if client.set(key, json.dumps(entry), nx=True, ex=settings.idempotency_ttl_seconds):
+            return None
+        existing = client.get(key)
+    except Exception as e:
+        logger.warning(f"Idempotency check skipped (Redis unavailable): {e}")
+        return None
+    return json.loads(existing) if existing else None
+
+
+def _release_idempotency_key(idem_key: Optional[str]) -> None:
+    """Delete a key claimed by a request that then failed, so a retry can queue the workflow."""
+    client = _get_redis() if idem_key else None
+    if client is None:
+        return
+    try:
+        client.delete(_IDEMPOTENCY_PREFIX + idem_key)
+    except Exception as e:
+        logger.warning(f"Could not release Idempotency-Key {idem_key}: {e}")
+
 
 class WorkflowRequest(BaseModel):
     """
@@ -23,7 +95,9 @@ class WorkflowRequest(BaseModel):
     # Input sources
     test_case_content: Optional[str] = Field(
         None,
-        description="Raw test case content (Cucumber scenarios, Selenium scripts, manual steps, etc.)"
+        max_length=MAX_TEST_CASE_CONTENT_LENGTH,
+        description="Raw test case content (Cucumber scenarios, Selenium scripts, manual steps, etc.). "
+                    "Max 1 MiB; use /workflow/execute-with-upload for larger inputs."
     )
     test_case_urls: Optional[List[str]] = Field(
         None, 
@@ -107,11 +181,14 @@ class WorkflowResponse(BaseModel):
     error: Optional[str] = None
 
 
-@router.post("/execute", response_model=WorkflowResponse)
+# WorkflowResponse is documented via `responses` rather than `response_model` so the
+# handler's pre-built instance is not re-validated on every request.
+@router.post("/execute", responses={200: {"model": WorkflowResponse}})
 async def execute_tdm_workflow(
     request: WorkflowRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ):
     """
     Execute complete TDM workflow
@@ -173,30 +250,122 @@ async def execute_tdm_workflow(
     - job_id: Job ID for tracking
     - operations: Status and results for each operation
     - overall_status: Overall workflow status (running, completed, failed)
+
+    Send an `Idempotency-Key` header to make retries safe: a repeat within the TTL
+    window returns the original workflow_id/job_id instead of queuing a new run.
     """
     
-    logger.info(f"Starting workflow execution: {request.dict()}")
-    
+    workflow_id = str(uuid.uuid4())
+    job_id = str(uuid.uuid4())
+    start_time = _now_iso()
+
+    # Redis and the Job lookup are blocking I/O, so keep them off the event loop
+    duplicate = await run_in_threadpool(_duplicate_workflow_response, idempotency_key, workflow_id, job_id, start_time, db)
+    if duplicate:
+        return duplicate
+    try:
+        return _queue_workflow(request, background_tasks, workflow_id, job_id, start_time)
+    except Exception:
+        await run_in_threadpool(_release_idempotency_key, idempotency_key)
+        raise
+
+
+@router.post("/execute-with-upload", responses={200: {"model": WorkflowResponse}})
+async def execute_tdm_workflow_with_upload(
+    background_tasks: BackgroundTasks,
+    test_case_file: UploadFile = File(..., description="Test case content too large for test_case_content"),
+    request_json: str = Form("{}", description="WorkflowRequest fields as JSON (test_case_content is ignored)"),
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """
+    Execute the TDM workflow with test case content uploaded as a file.
+    The upload is streamed to a temp file in 64 KiB chunks and only read back by the
+    background task, so large inputs are never held in the request or the task closure.
+    """
+    try:
+        request = WorkflowRequest.model_validate_json(request_json)
+    except ValidationError as e:
+        raise HTTPException(422, e.errors(include_url=False, include_context=False))
+    request.test_case_content = None
+
+    workflow_id = str(uuid.uuid4())
+    job_id = str(uuid.uuid4())
+    start_time = _now_iso()
+
+    duplicate = await run_in_threadpool(_duplicate_workflow_response, idempotency_key, workflow_id, job_id, start_time, db)
+    if duplicate:
+        return duplicate
+
+    test_case_path = Path(tempfile.gettempdir()) / f"tdm_{workflow_id}.txt"
+    try:
+        with open(test_case_path, "wb") as out:
+            while chunk := await test_case_file.read(_UPLOAD_CHUNK_SIZE):
+                out.write(chunk)
+        return _queue_workflow(request, background_tasks, workflow_id, job_id, start_time, test_case_path)
+    except Exception:
+        # The key was claimed for this request; free it so the client can retry
+        test_case_path.unlink(missing_ok=True)
+        await run_in_threadpool(_release_idempotency_key, idempotency_key)
+        raise
+
+
+def _duplicate_workflow_response(
+    idempotency_key: Optional[str], workflow_id: str, job_id: str, start_time: str, db: Session
+) -> Optional[WorkflowResponse]:
+    """Return the original response when idempotency_key was already used within the TTL window."""
+    if not idempotency_key:
+        return None
+    existing = _claim_idempotency_key(
+        idempotency_key,
+        {"workflow_id": workflow_id, "job_id": job_id, "start_time": start_time},
+    )
+    if not existing:
+        return None
+    from models import Job
+    job = db.query(Job).filter(Job.id == existing["job_id"]).first()
+    logger.info(f"[WORKFLOW] Duplicate request for Idempotency-Key {idempotency_key}: workflow_id={existing['workflow_id']}")
+    return WorkflowResponse.model_construct(
+        workflow_id=existing["workflow_id"],
+        job_id=existing["job_id"],
+        operations={},
+        overall_status=job.status if job else "queued",
+        start_time=existing["start_time"],
+    )
+
+
+def _queue_workflow(
+    request: WorkflowRequest,
+    background_tasks: BackgroundTasks,
+    workflow_id: str,
+    job_id: str,
+    start_time: str,
+    test_case_path: Optional[Path] = None,
+) -> WorkflowResponse:
+    """Queue execute_workflow as a background task. test_case_path (uploaded content) is read there and then removed."""
+    content_size = len(request.test_case_content or "")
+    logger.info(
+        f"Starting workflow execution: {request.dict(exclude={'test_case_content'})} "
+        f"(test_case_content: {content_size} chars{', uploaded file' if test_case_path else ''})"
+    )
+
     # Merge schema_version_id and dataset_version_id into config
     if request.schema_version_id:
         request.config["schema_version_id"] = request.schema_version_id
     if request.dataset_version_id:
         request.config["dataset_version_id"] = request.dataset_version_id
-    
-    # Generate IDs for tracking
-    import uuid
-    from datetime import datetime
-    workflow_id = str(uuid.uuid4())
-    job_id = str(uuid.uuid4())
-    
+
     # Execute workflow in background with its own DB session so logs are persisted
     def run_workflow_with_error_handling():
         db = SessionLocal()
         try:
             print(f"[WORKFLOW] Starting background execution: workflow_id={workflow_id}, job_id={job_id}", flush=True)
             logger.info(f"[WORKFLOW] Starting background execution: workflow_id={workflow_id}, job_id={job_id}")
+            test_case_content = request.test_case_content
+            if test_case_path is not None:
+                test_case_content = test_case_path.read_text(encoding="utf-8", errors="replace")
             result = execute_workflow(
-                test_case_content=request.test_case_content,
+                test_case_content=test_case_content,
                 test_case_urls=request.test_case_urls,
                 test_case_files=request.test_case_files,
                 connection_string=request.connection_string,
@@ -216,24 +385,26 @@ async def execute_tdm_workflow(
             traceback.print_exc()
         finally:
             db.close()
-    
+            if test_case_path is not None:
+                test_case_path.unlink(missing_ok=True)
+
     background_tasks.add_task(run_workflow_with_error_handling)
-    
+
     print(f"[WORKFLOW] Queued: workflow_id={workflow_id}, job_id={job_id}", flush=True)
     logger.info(f"[WORKFLOW] Queued: workflow_id={workflow_id}, job_id={job_id}")
-    
-    # Return immediately with job_id for tracking
-    return {
-        "workflow_id": workflow_id,
-        "job_id": job_id,
-        "operations": {},
-        "overall_status": "queued",
-        "start_time": datetime.utcnow().isoformat()
-    }
+
+    # Return immediately with job_id for tracking (fields are known-valid, skip validation)
+    return WorkflowResponse.model_construct(
+        workflow_id=workflow_id,
+        job_id=job_id,
+        operations={},
+        overall_status="queued",
+        start_time=start_time,
+    )
 
 
 @router.get("/logs/{job_id}")
-async def get_workflow_logs(
+def get_workflow_logs(
     job_id: str,
     db: Session = Depends(get_db)
 ):
@@ -241,12 +412,19 @@ async def get_workflow_logs(
     Get logs for a specific workflow job. Logs are written by the orchestrator
     and polled by the UI so they appear while the workflow is running.
     Includes job_status so the UI can stop polling when the job completes.
+    Sync handler: FastAPI runs it in the threadpool so the blocking query never stalls the event loop.
     """
-    from models import JobLog, Job
+    from models import Job
     job_id_str = str(job_id)
-    job = db.query(Job).filter(Job.id == job_id_str).first()
+    # Eager-load logs in the same query (one round-trip per poll)
+    job = (
+        db.query(Job)
+        .options(joinedload(Job.logs))
+        .filter(Job.id == job_id_str)
+        .first()
+    )
     job_status = job.status if job else None
-    logs = db.query(JobLog).filter(JobLog.job_id == job_id_str).order_by(JobLog.created_at).all()
+    logs = job.logs if job else []
     return {
         "job_id": job_id_str,
         "job_status": job_status,
@@ -274,7 +452,7 @@ class ClassifyIntentRequest(BaseModel):
 
 
 @router.post("/classify-intent")
-async def classify_workflow_intent(body: ClassifyIntentRequest):
+def classify_workflow_intent(body: ClassifyIntentRequest):
     """
     Classify intent and get recommended operations (Dynamic Decision Engine).
     Returns: intent, operations, preferred_synthetic_mode, plan.
@@ -412,22 +590,27 @@ async def get_workflow_templates():
 
 
 @router.get("/status/{workflow_id}")
-async def get_workflow_status(workflow_id: str, db: Session = Depends(get_db)):
+def get_workflow_status(workflow_id: str, db: Session = Depends(get_db)):
     """
     Get status of a running or completed workflow
     """
-    from models import Job, JobLog
+    from models import Job
 
-    # Find workflow job by workflow_id stored in request_json
-    job = db.query(Job).filter(
-        Job.operation == "workflow",
-        Job.request_json["workflow_id"].astext == workflow_id,
-    ).first()
+    # Find workflow job by workflow_id stored in request_json; logs are joined in the same query
+    job = (
+        db.query(Job)
+        .options(joinedload(Job.logs))
+        .filter(
+            Job.operation == "workflow",
+            Job.request_json["workflow_id"].astext == workflow_id,
+        )
+        .first()
+    )
 
     if not job:
         return {"error": "Workflow not found"}
 
-    logs = db.query(JobLog).filter(JobLog.job_id == job.id).order_by(JobLog.created_at).all()
+    logs = job.logs
     error = None
     if job.result_json and isinstance(job.result_json, dict):
         error = job.result_json.get("error")
@@ -103,6 +103,7 @@ class ProvisionRequest(BaseModel):
     target_env: str
     reset_env: bool = True
     run_smoke_tests: bool = True
+    parallelism: int = Field(8, ge=1, le=32, description="Tables loaded concurrently")
 
 
 class ProvisionResponse(BaseModel):
@@ -1,78 +1,342 @@
 """UI Crawler for extracting test data schema from web pages."""
+import asyncio
+import functools
+import hashlib
+import json
 import logging
-from typing import Dict, List, Any
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Any, Optional
 import re
 from urllib.parse import urlparse, urljoin
 try:
-    from playwright.sync_api import sync_playwright, Page, TimeoutError as PlaywrightTimeout
+    from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
     PLAYWRIGHT_AVAILABLE = True
 except ImportError:
     PLAYWRIGHT_AVAILABLE = False
+
+from config import settings
     
 logger = logging.getLogger(__name__)
 
+# Max pages crawled at once; each URL gets its own (cheap) context on the shared browser
+DEFAULT_CONCURRENCY = 8
+# Navigation timeout per URL; a slow page is extracted from whatever DOM has arrived
+NAVIGATION_TIMEOUT_MS = 3000
+# Elements the schema is extracted from; a page with none of them is done once the DOM is loaded
+SCHEMA_ELEMENTS_SELECTOR = "form, table, input, select, textarea"
+# Browser context options for crawl retries; they reuse the launched browser instead of relaunching
+MOBILE_CONTEXT_OPTIONS = {
+    "viewport": {"width": 375, "height": 812},
+    "user_agent": (
+        "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 "
+        "(KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
+    ),
+    "is_mobile": True,
+    "has_touch": True,
+}
+# Desktop Chrome user agent: headless Chromium otherwise announces itself as "HeadlessChrome"
+DESKTOP_CONTEXT_OPTIONS = {
+    "viewport": {"width": 1366, "height": 768},
+    "user_agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+    ),
+}
+
+_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}')
+_EMAIL_RE = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+
+# Serializes every form, table and orphan field on the page in a single page.evaluate call,
+# instead of one CDP round-trip per attribute/element.
+_EXTRACT_SCHEMA_JS = """
+() => {
+    const text = (el) => (el.innerText || "").trim();
+    const field = (el) => ({
+        tag: el.tagName.toLowerCase(),
+        type: el.getAttribute("type"),
+        name: el.getAttribute("name") || el.getAttribute("id") || el.getAttribute("placeholder") || "",
+        placeholder: el.getAttribute("placeholder"),
+        required: el.hasAttribute("required"),
+        pattern: el.getAttribute("pattern"),
+        // option.text is the whitespace-collapsed label without innerText's layout pass
+        options: el.tagName === "SELECT" ? Array.from(el.options).slice(0, 10).map((o) => o.text) : undefined,
+    });
+    const forms = Array.from(document.querySelectorAll("form")).map((f) => ({
+        name: f.getAttribute("name") || f.getAttribute("id") || f.getAttribute("class") || "unnamed_form",
+        action: f.getAttribute("action") || "",
+        fields: Array.from(f.querySelectorAll("input, select, textarea")).map(field),
+    }));
+    const tables = Array.from(document.querySelectorAll("table")).map((t) => {
+        const thead = t.querySelector("thead");
+        const firstRow = t.querySelector("tr");
+        const headerCells = thead ? thead.querySelectorAll("th") : (firstRow ? firstRow.querySelectorAll("th, td") : []);
+        return {
+            headers: Array.from(headerCells).map(text),
+            rows: Array.from(t.querySelectorAll("tbody tr")).slice(0, 5).map(
+                (r) => Array.from(r.querySelectorAll("td")).map(text)
+            ),
+        };
+    });
+    const orphans = Array.from(
+        document.querySelectorAll("input:not(form input), select:not(form select), textarea:not(form textarea)")
+    ).map(field);
+    return { forms, tables, orphans };
+}
+"""
+
+
+class SchemaCache:
+    """
+    Cache-aside store for merged crawl schemas, keyed by sha256(sorted URLs + hints + browser context options).
+    Backed by SQLite so repeat crawls are served across processes and restarts.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS schema_cache (key TEXT PRIMARY KEY, json BLOB, ts INTEGER)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    @staticmethod
+    def make_key(
+        urls: List[str], scenario_hints: Optional[Dict[str, Any]], context_options: Optional[Dict[str, Any]] = None
+    ) -> str:
+        payload = json.dumps(
+            {"urls": sorted(urls), "hints": scenario_hints, "context": context_options}, sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh copy of the cached schema, or None when missing or older than the TTL."""
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT json, ts FROM schema_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if time.time() - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM schema_cache WHERE key = ?", (key,))
+                return None
+        return json.loads(row[0])
+
+    def set(self, key: str, schema: Dict[str, Any]) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO schema_cache (key, json, ts) VALUES (?, ?, ?)",
+                (key, json.dumps(schema, default=str), int(time.time())),
+            )
+
+
+_schema_cache: Optional[SchemaCache] = None
+
+
+def get_schema_cache() -> Optional[SchemaCache]:
+    """Shared SchemaCache from settings; None when disabled or the cache file cannot be opened."""
+    global _schema_cache
+    if _schema_cache is None and settings.crawl_cache_ttl_seconds > 0:
+        try:
+            _schema_cache = SchemaCache(settings.crawl_cache_path, settings.crawl_cache_ttl_seconds)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Crawl schema cache disabled: {e}")
+            return None
+    return _schema_cache
+
+
+@functools.lru_cache(maxsize=10000)
+def _infer_field_type_from_name(name: str, field_type: str) -> str:
+    """Infer the semantic type of a field from its name and HTML input type (memoized: names recur across pages)."""
+    name_lower = name.lower()
+    
+    # Email
+    if field_type == "email" or "email" in name_lower or "mail" in name_lower:
+        return "email"
+    # Phone
+    if field_type == "tel" or "phone" in name_lower or "mobile" in name_lower:
+        return "phone"
+    # Date
+    if field_type == "date" or "date" in name_lower or "dob" in name_lower or "birth" in name_lower:
+        return "date"
+    # Number
+    if field_type == "number" or any(x in name_lower for x in ["age", "price", "amount", "quantity", "count"]):
+        return "integer"
+    # Name
+    if any(x in name_lower for x in ["name", "first", "last", "fullname"]):
+        return "person_name"
+    # Address
+    if any(x in name_lower for x in ["address", "street", "city", "zip", "postal"]):
+        return "address"
+    # Password
+    if field_type == "password" or "password" in name_lower or "pwd" in name_lower:
+        return "password"
+    # Boolean
+    if field_type == "checkbox":
+        return "boolean"
+        
+    return "string"
+
 
 class TestCaseCrawler:
-    """Crawls test case URLs to extract schema information dynamically."""
+    """
+    Crawls test case URLs to extract schema information dynamically.
+
+    One browser is launched per crawler and URLs are crawled concurrently, each in its
+    own browser context. Use `with` from sync code or `async with` from async code.
+    Merged schemas are cached (see SchemaCache), so repeat crawls skip the browser entirely.
+    """
     
-    def __init__(self):
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, cache: Optional[SchemaCache] = None):
+        self.concurrency = concurrency
+        self._cache = cache
         self.playwright = None
         self.browser = None
-        self.context = None
+        self._loop = None
+
+    @property
+    def cache(self) -> Optional[SchemaCache]:
+        if self._cache is None:
+            self._cache = get_schema_cache()
+        return self._cache
         
     def __enter__(self):
         if not PLAYWRIGHT_AVAILABLE:
             logger.warning("Playwright not available. Install with: pip install playwright && playwright install")
             return self
-        try:
-            self.playwright = sync_playwright().start()
-            self.browser = self.playwright.chromium.launch(headless=True)
-            self.context = self.browser.new_context()
-        except Exception as e:
-            logger.error(f"Failed to initialize browser: {e}")
+        # Sync callers get a private event loop that owns the browser for the crawler's lifetime;
+        # the browser itself is launched on the first uncached crawl
+        self._loop = asyncio.new_event_loop()
         return self
         
     def __exit__(self, *args):
-        if self.context:
-            self.context.close()
+        if self._loop:
+            self._loop.run_until_complete(self._stop())
+            self._loop.close()
+            self._loop = None
+
+    async def __aenter__(self):
+        if not PLAYWRIGHT_AVAILABLE:
+            logger.warning("Playwright not available. Install with: pip install playwright && playwright install")
+        return self
+
+    async def __aexit__(self, *args):
+        await self._stop()
+
+    async def _start(self):
+        if self.playwright:
+            return
+        try:
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(headless=True)
+        except Exception as e:
+            logger.error(f"Failed to initialize browser: {e}")
+
+    async def _stop(self):
         if self.browser:
-            self.browser.close()
+            await self.browser.close()
+            self.browser = None
         if self.playwright:
-            self.playwright.stop()
+            await self.playwright.stop()
+            self.playwright = None
             
-    def crawl_test_cases(self, urls: List[str], scenario_hints: Dict[str, Any] = None) -> Dict[str, Any]:
+    def crawl_test_cases(
+        self,
+        urls: List[str],
+        scenario_hints: Dict[str, Any] = None,
+        context_options: Optional[Dict[str, Any]] = None,
+        fallback: bool = True,
+    ) -> Optional[Dict[str, Any]]:
         """
         Crawl multiple test case URLs and extract schema information.
         
         Args:
             urls: List of URLs to crawl (test cases)
             scenario_hints: Optional hints about the domain/scenario
+            context_options: Optional browser.new_context() options (viewport, user_agent, ...)
+            fallback: When no page could be extracted, return the domain fallback schema (True) or None (False)
             
         Returns:
             Dict with entities, fields, and inferred schema
         """
         if not PLAYWRIGHT_AVAILABLE:
             logger.warning("Playwright not available, returning empty schema")
-            return self._fallback_schema(scenario_hints)
-            
-        extracted_schemas = []
-        for url in urls:
-            try:
-                schema = self._crawl_single_page(url, scenario_hints)
-                if schema:
-                    extracted_schemas.append(schema)
-            except Exception as e:
-                logger.error(f"Failed to crawl {url}: {e}")
+            return self._fallback_schema(scenario_hints) if fallback else None
+        cached = self._get_cached(urls, scenario_hints, context_options)
+        if cached is not None:
+            return cached
+        if self._loop is None:
+            # Not entered via `with`: own the browser for this call only
+            with self:
+                return self._loop.run_until_complete(self._crawl_and_cache(urls, scenario_hints, context_options, fallback))
+        return self._loop.run_until_complete(self._crawl_and_cache(urls, scenario_hints, context_options, fallback))
+
+    async def crawl_test_cases_async(
+        self,
+        urls: List[str],
+        scenario_hints: Dict[str, Any] = None,
+        context_options: Optional[Dict[str, Any]] = None,
+        fallback: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        """Async variant of crawl_test_cases; pages are crawled concurrently up to `concurrency`."""
+        if not PLAYWRIGHT_AVAILABLE:
+            logger.warning("Playwright not available, returning empty schema")
+            return self._fallback_schema(scenario_hints) if fallback else None
+        cached = self._get_cached(urls, scenario_hints, context_options)
+        if cached is not None:
+            return cached
+        return await self._crawl_and_cache(urls, scenario_hints, context_options, fallback)
+
+    def _get_cached(
+        self, urls: List[str], scenario_hints: Optional[Dict[str, Any]], context_options: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        if not self.cache:
+            return None
+        cached = self.cache.get(SchemaCache.make_key(urls, scenario_hints, context_options))
+        if cached is not None:
+            logger.info(f"Crawl schema cache hit for {len(urls)} URL(s)")
+        return cached
+
+    async def _crawl_and_cache(
+        self,
+        urls: List[str],
+        scenario_hints: Optional[Dict[str, Any]],
+        context_options: Optional[Dict[str, Any]] = None,
+        fallback: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        await self._start()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def crawl(url: str) -> Dict:
+            async with semaphore:
+                try:
+                    return await self._crawl_single_page(url, scenario_hints, context_options)
+                except Exception as e:
+                    logger.error(f"Failed to crawl {url}: {e}")
+                    return {}
+
+        # gather keeps input order, so merge results match the sequential crawl
+        extracted_schemas = [schema for schema in await asyncio.gather(*(crawl(url) for url in urls)) if schema]
+        if not extracted_schemas and not fallback:
+            return None
                 
-        # Merge all schemas
-        return self._merge_schemas(extracted_schemas, scenario_hints)
+        # Merge all schemas; only real crawl results are cached, never the domain fallback
+        merged = self._merge_schemas(extracted_schemas, scenario_hints)
+        if self.cache and extracted_schemas and merged.get("entities"):
+            self.cache.set(SchemaCache.make_key(urls, scenario_hints, context_options), merged)
+        return merged
         
-    def _crawl_single_page(self, url: str, scenario_hints: Dict = None) -> Dict:
+    async def _crawl_single_page(
+        self, url: str, scenario_hints: Dict = None, context_options: Optional[Dict[str, Any]] = None
+    ) -> Dict:
         """Crawl a single page and extract schema from forms, tables, and UI elements."""
-        if not self.context:
+        if not self.browser:
             return {}
             
-        page = self.context.new_page()
+        context = await self.browser.new_context(**(context_options or {}))
+        page = await context.new_page()
         schema = {
             "url": url,
             "forms": [],
@@ -81,30 +345,39 @@ class TestCaseCrawler:
         }
         
         try:
-            page.goto(url, timeout=30000, wait_until="domcontentloaded")
+            # Fail fast: only wait for the response to commit, then for the DOM we need
             try:
-                page.wait_for_load_state("networkidle", timeout=15000)
-            except Exception:
-                page.wait_for_load_state("load", timeout=5000)
+                await page.goto(url, timeout=NAVIGATION_TIMEOUT_MS, wait_until="commit")
+            except PlaywrightTimeout:
+                try:
+                    await page.wait_for_selector("body", timeout=2000, state="attached")
+                except PlaywrightTimeout:
+                    logger.warning(f"No DOM from {url} within navigation timeout, skipping")
+                    return {}
+            # Wait only for the elements we extract; networkidle never settles on SPAs with analytics/websockets
+            try:
+                await page.wait_for_selector(SCHEMA_ELEMENTS_SELECTOR, timeout=3000, state="attached")
+            except PlaywrightTimeout:
+                logger.debug(f"No form/table elements on {url}")
             
+            # Serialize all forms, tables and orphan fields in one browser round-trip
+            raw = await page.evaluate(_EXTRACT_SCHEMA_JS)
+
             # Phase 1: Extract from forms
-            forms = page.query_selector_all("form")
-            for form in forms:
-                form_schema = self._extract_form_schema(form, page)
+            for form in raw.get("forms", []):
+                form_schema = self._extract_form_schema(form)
                 if form_schema:
                     schema["forms"].append(form_schema)
                     
             # Phase 2: Extract from tables
-            tables = page.query_selector_all("table")
-            for table in tables:
+            for table in raw.get("tables", []):
                 table_schema = self._extract_table_schema(table)
                 if table_schema:
                     schema["tables"].append(table_schema)
                     
             # Phase 3: Extract from other UI elements (inputs, selects not in forms)
-            orphan_inputs = page.query_selector_all("input:not(form input), select:not(form select), textarea:not(form textarea)")
             orphan_fields = []
-            for inp in orphan_inputs:
+            for inp in raw.get("orphans", []):
                 field = self._extract_field_info(inp)
                 if field:
                     orphan_fields.append(field)
@@ -114,37 +387,29 @@ class TestCaseCrawler:
         except Exception as e:
             logger.error(f"Error crawling {url}: {e}")
         finally:
-            page.close()
+            await context.close()
             
         return schema
         
-    def _extract_form_schema(self, form, page: Page) -> Dict:
-        """Extract schema from a form element."""
-        form_name = form.get_attribute("name") or form.get_attribute("id") or form.get_attribute("class") or "unnamed_form"
-        action = form.get_attribute("action") or ""
-        
+    def _extract_form_schema(self, form: Dict) -> Dict:
+        """Extract schema from a form serialized by _EXTRACT_SCHEMA_JS."""
         fields = []
-        inputs = form.query_selector_all("input, select, textarea")
-        
-        for inp in inputs:
+        for inp in form.get("fields", []):
             field = self._extract_field_info(inp)
             if field:
                 fields.append(field)
                 
         return {
-            "name": form_name,
-            "action": action,
+            "name": form.get("name") or "unnamed_form",
+            "action": form.get("action") or "",
             "fields": fields
         } if fields else None
         
-    def _extract_field_info(self, element) -> Dict:
-        """Extract field information from an input element."""
-        try:
-            tag_name = (element.evaluate("el => el.tagName") or "input").lower()
-        except Exception:
-            tag_name = "input"
-        field_type = element.get_attribute("type") or "text"
-        name = element.get_attribute("name") or element.get_attribute("id") or element.get_attribute("placeholder") or ""
+    def _extract_field_info(self, element: Dict) -> Dict:
+        """Extract field information from an input element serialized by _EXTRACT_SCHEMA_JS."""
+        tag_name = (element.get("tag") or "input").lower()
+        field_type = element.get("type") or "text"
+        name = element.get("name") or ""
         
         if not name or name in ["submit", "button", "csrf", "token"]:
             return None
@@ -157,42 +422,24 @@ class TestCaseCrawler:
             "tag": tag_name,
             "type": field_type,
             "inferred_type": inferred_type,
-            "placeholder": element.get_attribute("placeholder") or "",
-            "required": element.get_attribute("required") is not None,
-            "pattern": element.get_attribute("pattern") or ""
+            "placeholder": element.get("placeholder") or "",
+            "required": bool(element.get("required")),
+            "pattern": element.get("pattern") or ""
         }
         
-        # For select, get options
+        # For select, get options (first 10, limited in the browser)
         if tag_name == "select":
-            options = element.query_selector_all("option")
-            field["options"] = [opt.inner_text() for opt in options[:10]]  # Limit to 10
+            field["options"] = element.get("options") or []
             
         return field
         
-    def _extract_table_schema(self, table) -> Dict:
-        """Extract schema from an HTML table."""
-        headers = []
-        thead = table.query_selector("thead")
-        if thead:
-            ths = thead.query_selector_all("th")
-            headers = [th.inner_text().strip() for th in ths]
-        else:
-            # Try first tr
-            first_row = table.query_selector("tr")
-            if first_row:
-                ths = first_row.query_selector_all("th, td")
-                headers = [th.inner_text().strip() for th in ths]
-                
+    def _extract_table_schema(self, table: Dict) -> Dict:
+        """Extract schema from an HTML table serialized by _EXTRACT_SCHEMA_JS (headers + up to 5 sample rows)."""
+        headers = table.get("headers") or []
         if not headers:
             return None
             
-        # Sample a few rows to infer types
-        rows = table.query_selector_all("tbody tr")[:5]
-        sample_data = []
-        for row in rows:
-            cells = row.query_selector_all("td")
-            sample_data.append([cell.inner_text().strip() for cell in cells])
-            
+        sample_data = table.get("rows") or []
         columns = []
         for i, header in enumerate(headers):
             if not header:
@@ -205,63 +452,38 @@ class TestCaseCrawler:
             })
             
         return {
-            "name": "table_" + str(id(table))[:8],
+            # Named by its headers, so the same table seen on several pages/crawls merges into one entity
+            "name": "table_" + hashlib.blake2b("|".join(headers).encode(), digest_size=4).hexdigest(),
             "columns": columns
         } if columns else None
         
     def _infer_field_type(self, name: str, field_type: str, element) -> str:
         """Infer the semantic type of a field."""
-        name_lower = name.lower()
-        
-        # Email
-        if field_type == "email" or "email" in name_lower or "mail" in name_lower:
-            return "email"
-        # Phone
-        if field_type == "tel" or "phone" in name_lower or "mobile" in name_lower:
-            return "phone"
-        # Date
-        if field_type == "date" or "date" in name_lower or "dob" in name_lower or "birth" in name_lower:
-            return "date"
-        # Number
-        if field_type == "number" or any(x in name_lower for x in ["age", "price", "amount", "quantity", "count"]):
-            return "integer"
-        # Name
-        if any(x in name_lower for x in ["name", "first", "last", "fullname"]):
-            return "person_name"
-        # Address
-        if any(x in name_lower for x in ["address", "street", "city", "zip", "postal"]):
-            return "address"
-        # Password
-        if field_type == "password" or "password" in name_lower or "pwd" in name_lower:
-            return "password"
-        # Boolean
-        if field_type == "checkbox":
-            return "boolean"
-            
-        return "string"
+        return _infer_field_type_from_name(name, field_type)
         
     def _infer_type_from_values(self, values: List[str]) -> str:
         """Infer type from sample values."""
         if not values:
             return "string"
             
-        # Check if all numeric
-        numeric_count = sum(1 for v in values if v.replace(".", "", 1).replace("-", "", 1).isdigit())
-        if numeric_count == len(values):
+        # Check if all numeric; all() stops at the first non-numeric value and
+        # isdecimal() settles plain integers without the replace() copies
+        if all(v.isdecimal() or v.replace(".", "", 1).replace("-", "", 1).isdigit() for v in values):
             return "number"
-            
-        # Check for dates
-        date_pattern = re.compile(r'\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}')
-        date_count = sum(1 for v in values if date_pattern.search(v))
-        if date_count > len(values) * 0.5:
-            return "date"
-            
-        # Check for emails
-        email_pattern = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
-        email_count = sum(1 for v in values if email_pattern.search(v))
-        if email_count > len(values) * 0.5:
-            return "email"
-            
+
+        # Dates, then emails: need a strict majority, stop once it is reached or out of reach
+        n = len(values)
+        majority = n // 2 + 1
+        for label, pattern in (("date", _DATE_RE), ("email", _EMAIL_RE)):
+            hits = 0
+            for i, v in enumerate(values):
+                if pattern.search(v):
+                    hits += 1
+                    if hits >= majority:
+                        return label
+                elif hits + (n - i - 1) < majority:
+                    break
+
         return "string"
         
     def _merge_schemas(self, schemas: List[Dict], scenario_hints: Dict = None) -> Dict:
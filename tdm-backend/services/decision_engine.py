@@ -2,6 +2,9 @@
 Dynamic Decision Engine — Intent-aware pipeline planning.
 Decides what to run based on user input, test cases, and schema availability.
 """
+import copy
+import functools
+import json
 import re
 import logging
 from typing import Dict, List, Optional, Any
@@ -17,8 +20,22 @@ INTENT_OPERATIONS = [
     "schema_fusion", "quality"
 ]
 
+# Position of each operation in the pipeline, used to order intent["operations"]
+_CANONICAL_ORDER = {op: i for i, op in enumerate(INTENT_OPERATIONS)}
+
 PREFERRED_SYNTHETIC_MODES = ["schema", "url", "test_case", "domain", "hybrid"]
 
+# Form field patterns (Enter/fill/input/type, Selenium send_keys, Playwright fill/type),
+# compiled once as a single alternation so content is scanned in one pass
+FORM_FIELD_PATTERNS = [
+    r"\b(?:enter|fill|input|type)\s+[\"']?\w+[\"']?\s+as\s+",
+    r"\b(?:enter|fill|input|type)\s+[\"'][^\"']+[\"']\s+in\s+",
+    r"send_keys\s*\([^)]+\)",
+    r"\.fill\s*\([^)]+\)",
+    r"\.type\s*\([^)]+\)",
+]
+_FORM_FIELDS_RE = re.compile("|".join(f"(?:{p})" for p in FORM_FIELD_PATTERNS), re.IGNORECASE)
+
 
 def classify_intent(
     test_case_content: Optional[str] = None,
@@ -39,7 +56,25 @@ def classify_intent(
     - If PII detected → auto-enable masking
     - If synthetic is needed → choose mode based on schemas available
     """
-    config_flags = config_flags or {}
+    # Pure function of its inputs: memoized, returned as a copy so callers can mutate it.
+    # Content (up to MiBs) is reduced to the two facts the rules use, so the cache never pins request bodies.
+    key = (
+        bool(test_case_content),
+        bool(test_case_content) and _has_form_fields(test_case_content),
+        tuple(test_case_urls or ()),
+        connection_string,
+        domain,
+        schema_version_id,
+        json.dumps(config_flags or {}, sort_keys=True, default=str),
+    )
+    return copy.deepcopy(_classify_intent_cached(key))
+
+
+@functools.lru_cache(maxsize=256)
+def _classify_intent_cached(key: tuple) -> Dict[str, Any]:
+    has_content, has_form_fields, test_case_urls, connection_string, domain, schema_version_id, config_flags_json = key
+    test_case_urls = list(test_case_urls)
+    config_flags = json.loads(config_flags_json)
     intent = {
         "requires_ui_crawl": False,
         "requires_db": False,
@@ -73,18 +108,18 @@ def classify_intent(
             intent["preferred_synthetic_mode"] = "domain"
 
     # Rule: test case content with form fields → test_case mode
-    if test_case_content and _has_form_fields(test_case_content):
+    if has_form_fields:
         if "synthetic" not in intent["operations"]:
             intent["operations"].append("synthetic")
         if not intent["requires_ui_crawl"]:
             intent["preferred_synthetic_mode"] = "test_case"
 
     # Rule: no schema found → domain fallback
-    if not schema_version_id and not connection_string and (domain or test_case_content or test_case_urls):
+    if not schema_version_id and not connection_string and (domain or has_content or test_case_urls):
         intent["requires_domain_fallback"] = True
         if "synthetic" not in intent["operations"]:
             intent["operations"].append("synthetic")
-        intent["preferred_synthetic_mode"] = "hybrid" if (domain and (test_case_content or test_case_urls)) else "domain"
+        intent["preferred_synthetic_mode"] = "hybrid" if (domain and (has_content or test_case_urls)) else "domain"
 
     # Rule: PII detection → auto-enable masking when we have schema
     if schema_version_id or connection_string:
@@ -97,19 +132,11 @@ def classify_intent(
         if "provision" not in intent["operations"]:
             intent["operations"].append("provision")
 
-    # Deduplicate and order
-    order = ["discover", "pii", "subset", "mask", "synthetic", "provision", "schema_fusion", "quality"]
-    seen = set()
-    ordered = []
-    for op in order:
-        if op in intent["operations"] and op not in seen:
-            seen.add(op)
-            ordered.append(op)
-    for op in intent["operations"]:
-        if op not in seen:
-            seen.add(op)
-            ordered.append(op)
-    intent["operations"] = ordered
+    # Deduplicate and order (canonical operations first; unknown ones keep insertion order)
+    intent["operations"] = sorted(
+        dict.fromkeys(intent["operations"]),
+        key=lambda op: _CANONICAL_ORDER.get(op, len(_CANONICAL_ORDER)),
+    )
 
     logger.info(f"[DECISION] Intent: {intent}")
     return intent
@@ -119,18 +146,7 @@ def _has_form_fields(content: str) -> bool:
     """Detect if test case has form field patterns (Enter, fill, input, type)."""
     if not content or not content.strip():
         return False
-    patterns = [
-        r"\b(?:enter|fill|input|type)\s+[\"']?\w+[\"']?\s+as\s+",
-        r"\b(?:enter|fill|input|type)\s+[\"'][^\"']+[\"']\s+in\s+",
-        r"send_keys\s*\([^)]+\)",
-        r"\.fill\s*\([^)]+\)",
-        r"\.type\s*\([^)]+\)",
-    ]
-    content_lower = content.lower()
-    for p in patterns:
-        if re.search(p, content_lower, re.IGNORECASE):
-            return True
-    return False
+    return bool(_FORM_FIELDS_RE.search(content))
 
 
 def generate_pipeline_plan(
@@ -8,35 +8,42 @@ from typing import Dict, List, Any, Optional, Callable
 logger = logging.getLogger("tdm.fallbacks")
 
 
-def with_crawl_fallbacks(crawl_fn: Callable, urls: List[str], hints: Dict = None) -> Dict[str, Any]:
+# Crawl retry tiers: (step name, browser.new_context() options). Every tier runs on the same
+# browser; only a fresh context is created per attempt.
+CRAWL_CONTEXT_TIERS = [
+    ("playwright_headless", None),
+    ("playwright_mobile", "mobile"),
+    ("playwright_desktop", "desktop"),
+]
+
+
+def with_crawl_fallbacks(urls: List[str], hints: Dict = None, crawler=None) -> Dict[str, Any]:
     """
-    Crawling fallbacks: Playwright headless → headful → mobile viewport → requests → cached → domain pack.
+    Crawling fallbacks: Playwright headless → mobile viewport → desktop viewport/user agent (still headless) → domain pack.
+    Pass an entered TestCaseCrawler to share its browser; otherwise one is launched for all attempts.
     """
-    fallbacks_used = []
-    result = None
+    from services.crawler import TestCaseCrawler, MOBILE_CONTEXT_OPTIONS, DESKTOP_CONTEXT_OPTIONS
 
-    # 1. Playwright headless (default)
-    try:
-        result = crawl_fn(urls=urls, headless=True, hints=hints)
-        if result and result.get("entities"):
-            return {"schema": result, "fallbacks_used": fallbacks_used}
-    except Exception as e:
-        logger.warning(f"Crawl headless failed: {e}")
-        fallbacks_used.append({"step": "playwright_headless", "error": str(e)})
+    if crawler is None:
+        with TestCaseCrawler() as crawler:
+            return with_crawl_fallbacks(urls, hints, crawler=crawler)
 
-    # 2. Playwright headful
-    try:
-        result = crawl_fn(urls=urls, headless=False, hints=hints)
-        if result and result.get("entities"):
-            fallbacks_used.append({"step": "playwright_headful", "reason": "headless failed"})
-            return {"schema": result, "fallbacks_used": fallbacks_used}
-    except Exception as e:
-        logger.warning(f"Crawl headful failed: {e}")
-        fallbacks_used.append({"step": "playwright_headful", "error": str(e)})
+    context_options = {"mobile": MOBILE_CONTEXT_OPTIONS, "desktop": DESKTOP_CONTEXT_OPTIONS}
+    fallbacks_used = []
+    for step, profile in CRAWL_CONTEXT_TIERS:
+        try:
+            # fallback=False: a crawl that extracted no page returns None instead of the domain pack
+            result = crawler.crawl_test_cases(urls, hints, context_options=context_options.get(profile), fallback=False)
+            if result and result.get("entities"):
+                if fallbacks_used:
+                    fallbacks_used.append({"step": step, "reason": "previous crawl returned no entities"})
+                return {"schema": result, "fallbacks_used": fallbacks_used}
+            fallbacks_used.append({"step": step, "error": "no entities extracted"})
+        except Exception as e:
+            logger.warning(f"Crawl {step} failed: {e}")
+            fallbacks_used.append({"step": step, "error": str(e)})
 
-    # 3. Domain pack fallback
-    from services.crawler import TestCaseCrawler
-    crawler = TestCaseCrawler()
+    # Domain pack fallback
     result = crawler._fallback_schema(hints or {})
     fallbacks_used.append({"step": "domain_pack", "reason": "crawl unavailable"})
     return {"schema": result, "fallbacks_used": fallbacks_used}
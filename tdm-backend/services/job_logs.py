@@ -0,0 +1,45 @@
+"""Buffered JobLog writer: batches log rows so a job does not commit once per log line."""
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from models import JobLog
+
+DEFAULT_BATCH_SIZE = 50
+
+
+class JobLogBuffer:
+    """
+    Collects JobLog rows and writes them with one commit per batch.
+    Error-level lines flush immediately; call flush() when the job finishes.
+    created_at is set client-side: rows committed in one transaction would otherwise
+    share the server's transaction timestamp and lose their order.
+    """
+
+    def __init__(self, db: Session, job_id: str, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.db = db
+        self.job_id = job_id
+        self.batch_size = batch_size
+        self.pending: List[JobLog] = []
+
+    def log(self, msg: str, level: str = "info", step: Optional[str] = None, details: Optional[dict] = None):
+        self.pending.append(
+            JobLog(
+                job_id=self.job_id,
+                level=level,
+                message=msg,
+                step=step,
+                details=details,
+                created_at=datetime.now(timezone.utc),
+            )
+        )
+        if level == "error" or len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Add pending rows and commit (together with anything else staged on the session)."""
+        if self.pending:
+            self.db.add_all(self.pending)
+            self.pending = []
+        self.db.commit()
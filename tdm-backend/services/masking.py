@@ -1,57 +1,97 @@
 """Apply masking rules to a dataset version; write new version."""
 import hashlib
-import re
 import logging
+from collections import defaultdict
 from uuid import uuid4
 from pathlib import Path
-import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from datetime import datetime
 
 from config import settings
 from database import SessionLocal
-from models import DatasetVersion, DatasetMetadata, Job, JobLog, Lineage
+from models import DatasetVersion, DatasetMetadata, Job, Lineage
 from dataset_store import get_dataset_dir, ensure_dataset_dir
+from services.job_logs import JobLogBuffer
+from services.process_pool import process_pool_workers, spawn_executor
 
 logger = logging.getLogger(__name__)
 SALT = b"tdm-mask-v1"
+# Keyed BLAKE2b hashers (key=SALT), built once and copied per value: no SALT + value concat,
+# and copying skips the per-call key setup
+_HASH_BASE = hashlib.blake2b(digest_size=8, key=SALT)
+_EMAIL_HASH_BASE = hashlib.blake2b(digest_size=4, key=SALT)
 
 
-def _mask_email_deterministic(val):
-    if pd.isna(val) or val == "":
-        return val
+def _as_text(arr: pa.ChunkedArray) -> pa.ChunkedArray:
+    return arr if pa.types.is_string(arr.type) else pc.cast(arr, pa.string())
+
+
+def _is_blank(arr: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Null/NaN or empty-string cells, which every rule leaves untouched."""
+    blank = pc.is_null(arr, nan_is_null=True)
+    if pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type):
+        blank = pc.or_kleene(blank, pc.equal(arr, ""))
+    return blank
+
+
+def _keep_blank(arr: pa.ChunkedArray, masked: pa.ChunkedArray) -> pa.ChunkedArray:
+    return pc.if_else(_is_blank(arr), _as_text(arr), masked)
+
+
+def _map_values(arr: pa.ChunkedArray, fn) -> pa.ChunkedArray:
+    """Apply fn to the non-blank values only; used for the keyed hashes Arrow has no kernel for."""
+    values = arr.to_pylist()
+    blank = _is_blank(arr).to_pylist()
+    return pa.chunked_array(
+        [pa.array([v if b else fn(v) for v, b in zip(values, blank)], type=pa.string())],
+        type=pa.string(),
+    )
+
+
+def _keyed_hexdigest(base, s: str) -> str:
+    h = base.copy()
+    h.update(s.encode())
+    return h.hexdigest()
+
+
+def _email_token(val) -> str:
     s = str(val).strip()
-    parts = s.split("@")
-    if len(parts) != 2:
+    if s.count("@") != 1:
         return "***@***.***"
-    h = hashlib.sha256((SALT + s.encode()).hex().encode()).hexdigest()[:8]
-    return f"{h}@masked.local"
+    return f"{_keyed_hexdigest(_EMAIL_HASH_BASE, s)}@masked.local"
+
+
+def _mask_email_deterministic(arr: pa.ChunkedArray) -> pa.ChunkedArray:
+    return _map_values(arr, _email_token)
 
 
-def _mask_hash(val):
-    if pd.isna(val) or val == "":
-        return val
-    return hashlib.sha256(SALT + str(val).encode()).hexdigest()[:16]
+def _hash_token(val) -> str:
+    return _keyed_hexdigest(_HASH_BASE, str(val))
 
 
-def _mask_redact(val):
-    if pd.isna(val) or val == "":
-        return val
-    return "REDACTED"
+def _mask_hash(arr: pa.ChunkedArray) -> pa.ChunkedArray:
+    return _map_values(arr, _hash_token)
 
 
-def _mask_null(val):
-    return None
+def _mask_redact(arr: pa.ChunkedArray) -> pa.ChunkedArray:
+    return _keep_blank(arr, pa.scalar("REDACTED"))
 
 
-def _mask_fpe_pan(val):
-    if pd.isna(val) or val == "":
-        return val
-    s = re.sub(r"\D", "", str(val))
-    if len(s) < 4:
-        return "****"
-    return s[:4] + "-****-****-" + s[-4:]
+def _mask_null(arr: pa.ChunkedArray) -> pa.ChunkedArray:
+    return pa.chunked_array([pa.nulls(len(arr), type=arr.type)], type=arr.type)
 
 
+def _mask_fpe_pan(arr: pa.ChunkedArray) -> pa.ChunkedArray:
+    digits = pc.replace_substring_regex(_as_text(arr), pattern=r"\D", replacement="")
+    pan = pc.binary_join_element_wise(
+        pc.utf8_slice_codeunits(digits, 0, 4), pc.utf8_slice_codeunits(digits, -4), "-****-****-"
+    )
+    return _keep_blank(arr, pc.if_else(pc.less(pc.utf8_length(digits), 4), pa.scalar("****"), pan))
+
+
+# Column-level transformers on Arrow arrays (pyarrow.compute kernels; no pandas round-trip)
 TRANSFORMERS = {
     "mask.email_deterministic": _mask_email_deterministic,
     "mask.hash": _mask_hash,
@@ -61,12 +101,99 @@ TRANSFORMERS = {
 }
 
 
+# Rows per record batch when streaming a parquet file; bounds peak memory per worker
+MASK_BATCH_SIZE = 65_536
+
+
+def _mask_table(table: pa.Table, column_rules: list[tuple[str, str]]) -> pa.Table:
+    for col, rule_type in column_rules:
+        fn = TRANSFORMERS.get(rule_type, _mask_redact)
+        table = table.set_column(table.schema.get_field_index(col), col, fn(table.column(col)))
+    if column_rules:
+        # pandas metadata still describes the pre-mask column types
+        table = table.replace_schema_metadata(None)
+    return table
+
+
+def _group_rules_by_table(rules: dict[str, str]) -> dict[str, list[tuple[str, str]]]:
+    """{"table.column": rule} -> {table: [(column, rule), ...]}; keys without a table are ignored."""
+    rules_by_table = defaultdict(list)
+    for key, rule_type in rules.items():
+        if "." in key:
+            tbl, col = key.split(".", 1)
+            rules_by_table[tbl].append((col, rule_type))
+    return rules_by_table
+
+
+def _blank_columns(pf: pq.ParquetFile) -> set[str]:
+    """
+    Columns that are entirely null or empty string, read from the row-group statistics
+    (no data is decoded). Columns without statistics are never reported as blank.
+    """
+    meta = pf.metadata
+    if meta.num_row_groups == 0:
+        return set()
+    blank = None
+    for i in range(meta.num_row_groups):
+        rg = meta.row_group(i)
+        rg_blank = set()
+        for j in range(rg.num_columns):
+            col = rg.column(j)
+            stats = col.statistics
+            if stats is None:
+                continue
+            if stats.has_null_count and stats.null_count == rg.num_rows:
+                rg_blank.add(col.path_in_schema)
+            elif stats.has_min_max and stats.min == "" and stats.max == "":
+                rg_blank.add(col.path_in_schema)
+        blank = rg_blank if blank is None else blank & rg_blank
+        if not blank:
+            break
+    return blank
+
+
+def _mask_one_file(args: tuple) -> tuple[str, int]:
+    """
+    Mask one parquet table into out_path. Module-level so it can run in a worker process.
+    The file is streamed in record batches through one ParquetWriter, so memory stays bounded
+    by MASK_BATCH_SIZE rather than the table size. Columns without a rule, and all-blank
+    columns (nothing to mask), are passed through as-is.
+    """
+    parquet_file, table_rules, out_path = args
+    tname = parquet_file.stem
+    pf = pq.ParquetFile(parquet_file)
+    column_names = set(pf.schema_arrow.names)
+    column_rules = [(col, rule_type) for col, rule_type in table_rules if col in column_names]
+    if column_rules:
+        blank = _blank_columns(pf)
+        column_rules = [(col, rule_type) for col, rule_type in column_rules if col not in blank]
+
+    num_rows = 0
+    writer = None
+    try:
+        for batch in pf.iter_batches(batch_size=MASK_BATCH_SIZE):
+            table = _mask_table(pa.Table.from_batches([batch]), column_rules)
+            if writer is None:
+                # Masked columns change type (e.g. to string), so the output schema comes from the first batch
+                writer = pq.ParquetWriter(out_path / f"{tname}.parquet", table.schema)
+            writer.write_table(table)
+            num_rows += table.num_rows
+        if writer is None:
+            # No rows: still write the (masked) schema
+            pq.write_table(_mask_table(pf.schema_arrow.empty_table(), column_rules), out_path / f"{tname}.parquet")
+    finally:
+        if writer is not None:
+            writer.close()
+    return tname, num_rows
+
+
 def run_mask(
     dataset_version_id: str,
     rules: dict[str, str],
     job_id: str | None = None,
 ) -> dict:
     db = SessionLocal()
+    logs = None
     try:
         if not job_id:
             job = Job(operation="mask", status="running", request_json={"dataset_version_id": dataset_version_id, "rules": rules})
@@ -77,43 +204,43 @@ def run_mask(
         else:
             job = db.query(Job).get(job_id)
 
-        def log(msg: str, level: str = "info"):
-            db.add(JobLog(job_id=job_id, level=level, message=msg))
-            db.commit()
+        logs = JobLogBuffer(db, job_id)
+        log = logs.log
 
         log("Starting masking")
+        logs.flush()
         base_dir = get_dataset_dir(dataset_version_id)
         if not base_dir.exists():
-            log("Dataset not found", "error")
             job.status = "failed"
-            db.commit()
+            log("Dataset not found", "error")
             return {"job_id": job_id, "masked_dataset_version_id": None}
 
         new_version_id = str(uuid4())
         ensure_dataset_dir(new_version_id)
         out_path = Path(settings.dataset_store_path) / new_version_id
+        files = sorted(base_dir.glob("*.parquet"))
+        # Each worker only gets its own table's rules
+        rules_by_table = _group_rules_by_table(rules)
+        tasks = [(f, rules_by_table.get(f.stem, []), out_path) for f in files]
+        # Row counts come from the parquet footers, so sizing the job reads no data pages
+        workers = process_pool_workers([pq.ParquetFile(f).metadata.num_rows for f in files])
+        if workers:
+            # Large jobs: tables are independent and masking is CPU-bound (hashing), so use processes, not threads.
+            with spawn_executor(workers) as ex:
+                results = list(ex.map(_mask_one_file, tasks))
+        else:
+            results = [_mask_one_file(task) for task in tasks]
         row_counts = {}
-        for parquet_file in base_dir.glob("*.parquet"):
-            tname = parquet_file.stem
-            df = pd.read_parquet(parquet_file)
-            for key, rule_type in rules.items():
-                if "." in key:
-                    tbl, col = key.split(".", 1)
-                    if tbl != tname:
-                        continue
-                    if col not in df.columns:
-                        continue
-                    fn = TRANSFORMERS.get(rule_type, _mask_redact)
-                    df[col] = df[col].apply(fn)
-            df.to_parquet(out_path / f"{tname}.parquet", index=False)
-            row_counts[tname] = len(df)
-            log(f"Masked table {tname}: {len(df)} rows")
+        for tname, row_count in results:
+            row_counts[tname] = row_count
+            log(f"Masked table {tname}: {row_count} rows")
 
         path_prefix = str(out_path)
+        src_dv = db.query(DatasetVersion).filter(DatasetVersion.id == dataset_version_id).first()
         dv = DatasetVersion(
             id=new_version_id,
             name=f"masked_{dataset_version_id[:8]}",
-            schema_version_id=db.query(DatasetVersion).filter(DatasetVersion.id == dataset_version_id).first().schema_version_id if db.query(DatasetVersion).filter(DatasetVersion.id == dataset_version_id).first() else None,
+            schema_version_id=src_dv.schema_version_id if src_dv else None,
             source_type="masked",
             status="active",
             path_prefix=path_prefix,
@@ -125,7 +252,7 @@ def run_mask(
         job.result_json = {"masked_dataset_version_id": new_version_id, "row_counts": row_counts}
         job.finished_at = datetime.utcnow()
         log("Masking completed")
-        db.commit()
+        logs.flush()
         return {"job_id": job_id, "masked_dataset_version_id": new_version_id}
     except Exception as e:
         logger.exception("Mask failed")
@@ -134,8 +261,7 @@ def run_mask(
             if job:
                 job.status = "failed"
                 job.result_json = {"error": str(e)}
-                db.add(JobLog(job_id=job_id, level="error", message=str(e)))
-                db.commit()
+                (logs or JobLogBuffer(db, job_id)).log(str(e), "error")
         raise
     finally:
         db.close()
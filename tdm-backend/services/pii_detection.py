@@ -1,14 +1,35 @@
 """PII classification: regex + optional Azure OpenAI."""
+import hashlib
+import json
 import re
 import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from pathlib import Path
 from typing import Optional
-from sqlalchemy.orm import Session
+import httpx
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, selectinload
 from openai import AzureOpenAI
 
 from config import settings
 from models import PIIClassification, ColumnMeta, TableMeta, SchemaVersion
 from database import SessionLocal
 
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 # Regex patterns for common PII
@@ -18,6 +39,35 @@ PATTERNS = {
     "ssn": re.compile(r"^\d{3}-\d{2}-\d{4}$"),
     "credit_card": re.compile(r"^\d{4}[\s\-]?\d{4}[\s\-]?\d{4}[\s\-]?\d{4}$"),
 }
+_PATTERN_TYPES = list(PATTERNS)
+
+
+def _compile_pattern_matcher():
+    """
+    All PATTERNS in one automaton, so a value is scanned once instead of once per pattern.
+    Returns value -> matching pii_type (first in PATTERNS order) or None.
+    """
+    if RE2_AVAILABLE:
+        pattern_set = re2.Set.MatchSet()
+        for pat in PATTERNS.values():
+            pattern_set.Add(pat.pattern)
+        pattern_set.Compile()
+
+        def match(value: str) -> Optional[str]:
+            hits = pattern_set.Match(value)
+            return _PATTERN_TYPES[min(hits)] if hits else None
+        return match
+
+    # Fallback: one alternation of named groups; the first alternative that fully matches wins
+    union = re.compile("|".join(f"(?P<{t}>{pat.pattern[1:-1]})" for t, pat in PATTERNS.items()))
+
+    def match(value: str) -> Optional[str]:
+        m = union.fullmatch(value)
+        return m.lastgroup if m else None
+    return match
+
+
+_match_pattern = _compile_pattern_matcher()
 
 COLUMN_NAME_HINTS = {
     "email": ["email", "e_mail", "mail", "user_email"],
@@ -28,58 +78,255 @@ COLUMN_NAME_HINTS = {
 }
 
 
+def _compile_hint_matcher(hints: dict[str, list[str]]):
+    """
+    Keyword substring matcher over all hint lists at once.
+    Returns lower-cased text -> first pii_type (in hints order) with a keyword in the text, or None.
+    """
+    types = list(hints)
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
+        for rank, keywords in enumerate(hints.values()):
+            for kw in keywords:
+                if kw not in automaton:
+                    automaton.add_word(kw, rank)
+        automaton.make_automaton()
+
+        def match(text: str) -> Optional[str]:
+            # one pass over text; the lowest rank keeps the dict-order priority of the keyword loop
+            rank = min((r for _, r in automaton.iter(text)), default=None)
+            return types[rank] if rank is not None else None
+        return match
+
+    # Fallback: one compiled alternation per pii_type instead of a Python-level `in` per keyword
+    unions = [
+        (t, re.compile("|".join(re.escape(k) for k in frozenset(keywords))))
+        for t, keywords in hints.items()
+    ]
+
+    def match(text: str) -> Optional[str]:
+        for t, union in unions:
+            if union.search(text):
+                return t
+        return None
+    return match
+
+
+_match_column_hint = _compile_hint_matcher(COLUMN_NAME_HINTS)
+# Value-level hints only for types the regex PATTERNS do not cover
+_match_value_hint = _compile_hint_matcher({t: k for t, k in COLUMN_NAME_HINTS.items() if t not in PATTERNS})
+
+
 def _regex_detect(value: str) -> Optional[tuple[str, float]]:
     if not value or not isinstance(value, str):
         return None
     value = value.strip()
-    for pii_type, pat in PATTERNS.items():
-        if pat.match(value):
-            return (pii_type, 0.95)
-    for pii_type, keywords in COLUMN_NAME_HINTS.items():
-        if pii_type in PATTERNS:
-            continue
-        if any(k in value.lower() for k in keywords):
-            return (pii_type, 0.7)
+    pii_type = _match_pattern(value)
+    if pii_type:
+        return (pii_type, 0.95)
+    pii_type = _match_value_hint(value.lower())
+    if pii_type:
+        return (pii_type, 0.7)
     return None
 
 
-def _llm_classify(column_name: str, sample_values: list[str]) -> Optional[tuple[str, float]]:
-    if not settings.azure_api_key or not settings.azure_endpoint:
-        return None
-    try:
-        client = AzureOpenAI(
+# Columns per chat completion, and completions in flight at once
+LLM_CLASSIFY_BATCH_SIZE = 50
+LLM_CLASSIFY_MAX_WORKERS = 10
+# Columns whose name hint is at least this confident are not sent to the LLM
+LLM_OVERRIDE_THRESHOLD = 0.8
+
+
+class PIILabelCache:
+    """
+    Exact-match cache of LLM PII labels, keyed by sha256(deployment | lower(column name) | data type).
+    Column names repeat heavily across schema versions, so most columns never reach the LLM.
+    "none" answers are cached too. Backed by SQLite, like the crawl schema cache.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS pii_label_cache (key TEXT PRIMARY KEY, pii_type TEXT, confidence REAL, ts INTEGER)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    @staticmethod
+    def make_key(column_name: str, data_type: Optional[str]) -> str:
+        payload = f"{settings.azure_deployment}|{column_name.lower()}|{data_type or ''}"
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get_many(self, keys: list[str]) -> dict[str, tuple[Optional[str], float]]:
+        """Fresh labels for the given keys: key -> (pii_type or None, confidence)."""
+        found = {}
+        cutoff = time.time() - self.ttl_seconds
+        with closing(self._connect()) as conn:
+            # stay well under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT key, pii_type, confidence, ts FROM pii_label_cache WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, pii_type, confidence, ts in rows:
+                    if ts >= cutoff:
+                        found[key] = (pii_type, confidence)
+        return found
+
+    def set_many(self, labels: dict[str, tuple[Optional[str], float]]) -> None:
+        now = int(time.time())
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO pii_label_cache (key, pii_type, confidence, ts) VALUES (?, ?, ?, ?)",
+                [(key, pii_type, confidence, now) for key, (pii_type, confidence) in labels.items()],
+            )
+
+
+_label_cache: Optional[PIILabelCache] = None
+
+
+def get_pii_label_cache() -> Optional[PIILabelCache]:
+    """Shared PIILabelCache from settings; None when disabled or the cache file cannot be opened."""
+    global _label_cache
+    if _label_cache is None and settings.pii_llm_cache_ttl_seconds > 0:
+        try:
+            _label_cache = PIILabelCache(settings.pii_llm_cache_path, settings.pii_llm_cache_ttl_seconds)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("PII label cache disabled: %s", e)
+            return None
+    return _label_cache
+
+
+_llm_client: Optional[AzureOpenAI] = None
+
+
+def _get_llm_client() -> AzureOpenAI:
+    """
+    One AzureOpenAI client per process. Its HTTP pool keeps a connection alive per classify
+    worker so batches reuse TCP/TLS sessions instead of reconnecting.
+    """
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = AzureOpenAI(
             api_key=settings.azure_api_key,
             api_version=settings.azure_api_version,
             azure_endpoint=settings.azure_endpoint.rstrip("/"),
+            http_client=httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=LLM_CLASSIFY_MAX_WORKERS,
+                    max_keepalive_connections=LLM_CLASSIFY_MAX_WORKERS,
+                ),
+            ),
         )
-        samples = ", ".join(repr(str(v)[:50]) for v in sample_values[:5])
-        prompt = (
-            f"Column name: {column_name}. Sample values (truncated): {samples}. "
-            "Classify as exactly one of: email, phone, ssn, credit_card, person_name, address, date_of_birth, ip_address, none. "
-            'Reply with JSON only: {"pii_type": "...", "confidence": 0.0-1.0}'
-        )
+    return _llm_client
+
+
+def _parse_llm_batch(text: str, keys: list[str]) -> dict[str, tuple[Optional[str], float]]:
+    """
+    Parse {"table.column": {"pii_type": ..., "confidence": ...}, ...}.
+    The request uses JSON mode, so the whole reply is one object.
+    Returns an entry for every answered key; "none" becomes (None, confidence). Unknown keys are dropped.
+    """
+    try:
+        obj = json.loads(text)
+    except ValueError:
+        return {}
+    if not isinstance(obj, dict):
+        return {}
+    results = {}
+    for key in keys:
+        entry = obj.get(key)
+        if not isinstance(entry, dict):
+            continue
+        t = entry.get("pii_type")
+        try:
+            c = float(entry.get("confidence", 0.8))
+        except (TypeError, ValueError):
+            c = 0.8
+        results[key] = (t if t and t != "none" else None, min(1.0, c))
+    return results
+
+
+def _llm_classify_batch(client: AzureOpenAI, columns: list[tuple[str, Optional[str]]]) -> dict[str, tuple[Optional[str], float]]:
+    """Classify up to LLM_CLASSIFY_BATCH_SIZE (table.column key, data_type) columns with one chat completion."""
+    keys = [key for key, _ in columns]
+    listing = "\n".join(f"- {key}: {data_type or 'unknown'}" for key, data_type in columns)
+    prompt = (
+        "Classify each database column below (table.column: data type) as exactly one of: "
+        "email, phone, ssn, credit_card, person_name, address, date_of_birth, ip_address, none.\n"
+        f"{listing}\n"
+        'Reply with JSON only: an object mapping every table.column to {"pii_type": "...", "confidence": 0.0-1.0}'
+    )
+    try:
         r = client.chat.completions.create(
             model=settings.azure_deployment,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.1,
+            response_format={"type": "json_object"},
         )
-        text = (r.choices[0].message.content or "").strip()
-        if "none" in text.lower() or "null" in text:
-            return None
-        import json
-        for part in text.split("}"):
-            part = part + "}"
-            try:
-                obj = json.loads(part)
-                t = obj.get("pii_type") or obj.get("pii_type")
-                c = float(obj.get("confidence", 0.8))
-                if t and t != "none":
-                    return (t, min(1.0, c))
-            except Exception:
-                continue
+        return _parse_llm_batch((r.choices[0].message.content or "").strip(), keys)
     except Exception as e:
-        logger.warning("LLM PII classify failed: %s", e)
-    return None
+        logger.warning("LLM PII classify failed for %d columns: %s", len(columns), e)
+        return {}
+
+
+def _llm_classify_columns(columns: list[tuple[str, str, Optional[str]]]) -> dict[tuple[str, str], tuple[str, float]]:
+    """
+    Classify (table, column, data_type) columns with the LLM. Cached labels are used first; the rest
+    go out as one request per LLM_CLASSIFY_BATCH_SIZE columns, sent in parallel.
+    Returns (table, column) -> (pii_type, confidence) for columns classified as PII.
+    """
+    if not columns or not settings.azure_api_key or not settings.azure_endpoint:
+        return {}
+    cache = get_pii_label_cache()
+    cache_keys = {(table, col): PIILabelCache.make_key(col, data_type) for table, col, data_type in columns}
+    labels = cache.get_many(list(set(cache_keys.values()))) if cache else {}
+
+    # Ask once per distinct (name, type) that is not cached
+    pending = {}
+    for table, col, data_type in columns:
+        cache_key = cache_keys[(table, col)]
+        if cache_key not in labels and cache_key not in pending:
+            pending[cache_key] = (f"{table}.{col}", data_type)
+    if pending:
+        logger.info("LLM PII classify: %d cached, %d to classify", len(labels), len(pending))
+        requested = list(pending.items())
+        batches = [requested[i:i + LLM_CLASSIFY_BATCH_SIZE] for i in range(0, len(requested), LLM_CLASSIFY_BATCH_SIZE)]
+        client = _get_llm_client()
+        fresh = {}
+        with ThreadPoolExecutor(max_workers=min(LLM_CLASSIFY_MAX_WORKERS, len(batches))) as ex:
+            for batch, answers in zip(batches, ex.map(lambda b: _llm_classify_batch(client, [c for _, c in b]), batches)):
+                for cache_key, (key, _) in batch:
+                    if key in answers:
+                        fresh[cache_key] = answers[key]
+        if cache and fresh:
+            cache.set_many(fresh)
+        labels.update(fresh)
+
+    results = {}
+    for table, col, _ in columns:
+        label = labels.get(cache_keys[(table, col)])
+        if label and label[0]:
+            results[(table, col)] = label
+    return results
+
+
+def _upsert_classifications(db: Session, rows: list[dict], chunk_size: int = 1000) -> None:
+    """Insert or update PII classifications with one INSERT ... ON CONFLICT per chunk."""
+    for i in range(0, len(rows), chunk_size):
+        stmt = insert(PIIClassification).values(rows[i:i + chunk_size])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_pii_sv_table_column",
+            set_={
+                "pii_type": stmt.excluded.pii_type,
+                "technique": stmt.excluded.technique,
+                "confidence": stmt.excluded.confidence,
+            },
+        )
+        db.execute(stmt)
 
 
 def run_pii_classification(
@@ -89,59 +336,64 @@ def run_pii_classification(
 ) -> list[dict]:
     db = SessionLocal()
     try:
-        sv = db.query(SchemaVersion).filter(SchemaVersion.id == schema_version_id).first()
+        # Tables and their columns in two IN-queries rather than one lazy load per table
+        sv = (
+            db.query(SchemaVersion)
+            .options(selectinload(SchemaVersion.tables_rel).selectinload(TableMeta.columns))
+            .filter(SchemaVersion.id == schema_version_id)
+            .first()
+        )
         if not sv:
             return []
         pii_entries = []
+        rows = {}
+        columns = []
+        # We don't sample from source DB here for simplicity; use name + type only, or add sampling later.
         for table in sv.tables_rel:
             for col in table.columns:
-                technique = "regex"
                 confidence = 0.0
-                pii_type = None
                 # Name-based hint
-                col_lower = col.name.lower()
-                for pt, keywords in COLUMN_NAME_HINTS.items():
-                    if any(k in col_lower for k in keywords):
-                        pii_type = pt
-                        confidence = 0.85
-                        break
+                pii_type = _match_column_hint(col.name.lower())
+                if pii_type:
+                    confidence = 0.85
                 if not pii_type and col.data_type and "char" in str(col.data_type).lower():
                     pii_type = "text"
                     confidence = 0.3
-                # We don't sample from source DB here for simplicity; use name + type only, or add sampling later
-                if use_llm and settings.azure_api_key:
-                    llm_result = _llm_classify(col.name, [col.name, col.data_type or ""])
-                    if llm_result:
-                        pt, conf = llm_result
-                        if conf > confidence:
-                            pii_type, confidence, technique = pt, conf, "llm"
-                if pii_type and pii_type != "none":
-                    existing = db.query(PIIClassification).filter(
-                        PIIClassification.schema_version_id == schema_version_id,
-                        PIIClassification.table_name == table.name,
-                        PIIClassification.column_name == col.name,
-                    ).first()
-                    if existing:
-                        existing.pii_type = pii_type
-                        existing.confidence = confidence
-                        existing.technique = technique
-                    else:
-                        rec = PIIClassification(
-                            schema_version_id=schema_version_id,
-                            table_name=table.name,
-                            column_name=col.name,
-                            pii_type=pii_type,
-                            technique=technique,
-                            confidence=confidence,
-                        )
-                        db.add(rec)
-                    pii_entries.append({
-                        "table": table.name,
-                        "column": col.name,
-                        "pii_type": pii_type,
-                        "confidence": float(confidence),
-                        "technique": technique,
-                    })
+                columns.append((table, col, pii_type, confidence))
+        # Columns the name hints leave uncertain go to the LLM up front in batched requests,
+        # not one round-trip per column
+        llm_results = {}
+        if use_llm and settings.azure_api_key:
+            llm_results = _llm_classify_columns([
+                (table.name, col.name, col.data_type)
+                for table, col, _, confidence in columns
+                if confidence < LLM_OVERRIDE_THRESHOLD
+            ])
+        for table, col, pii_type, confidence in columns:
+            technique = "regex"
+            llm_result = llm_results.get((table.name, col.name))
+            if llm_result:
+                pt, conf = llm_result
+                if conf > confidence:
+                    pii_type, confidence, technique = pt, conf, "llm"
+            if pii_type and pii_type != "none":
+                # keyed like uq_pii_sv_table_column: a same-named table in another DB schema overwrites, as before
+                rows[(table.name, col.name)] = {
+                    "schema_version_id": schema_version_id,
+                    "table_name": table.name,
+                    "column_name": col.name,
+                    "pii_type": pii_type,
+                    "technique": technique,
+                    "confidence": confidence,
+                }
+                pii_entries.append({
+                    "table": table.name,
+                    "column": col.name,
+                    "pii_type": pii_type,
+                    "confidence": float(confidence),
+                    "technique": technique,
+                })
+        _upsert_classifications(db, list(rows.values()))
         db.commit()
         return pii_entries
     finally:
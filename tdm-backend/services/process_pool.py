@@ -0,0 +1,26 @@
+"""Worker processes for CPU-bound, per-table jobs (synthetic generation, masking)."""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+# Total rows below which spawning worker processes costs more than it saves: each spawn
+# worker re-imports the backend (and rebuilds its Faker pools) in ~1.5s, while in-process
+# generation runs at ~1.5M rows/s, so small and normal-sized jobs stay in-process.
+PROCESS_POOL_MIN_ROWS = 5_000_000
+
+
+def process_pool_workers(row_counts: List[int]) -> int:
+    """Worker processes for independent tasks of the given row counts; 0 when the job should run in-process."""
+    workers = min(len(row_counts), os.cpu_count() or 1)
+    if workers < 2 or sum(row_counts) < PROCESS_POOL_MIN_ROWS:
+        return 0
+    return workers
+
+
+def spawn_executor(workers: int) -> ProcessPoolExecutor:
+    """
+    Process pool using the spawn start method: jobs run in server worker threads, where fork
+    is unsafe. Task functions must be module-level so they can be pickled.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
@@ -1,9 +1,17 @@
 """Load dataset version into target environment (PostgreSQL)."""
+import io
+import itertools
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from typing import Iterable
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 
 from database import SessionLocal
 from models import Environment, DatasetVersion, Job, JobLog, Lineage
@@ -12,6 +20,137 @@ from dataset_store import get_dataset_dir
 
 logger = logging.getLogger(__name__)
 
+# Rows per parquet record batch / CSV chunk written to COPY; bounds memory per table load
+COPY_BATCH_SIZE = 65_536
+# Tables loaded at once (one COPY connection each)
+DEFAULT_PROVISION_PARALLELISM = 8
+# Leading rows handed to pandas to pick the column types (as to_sql would from the full frame)
+_TYPE_SAMPLE_ROWS = 1000
+_CSV_OPTIONS = pacsv.WriteOptions(include_header=False)
+
+
+def _csv_bytes(batch: pa.RecordBatch) -> bytes:
+    """
+    One record batch as CSV for COPY ... (FORMAT CSV): nulls are unquoted empty fields (NULL),
+    strings are always quoted, so "" stays an empty string.
+    """
+    buf = io.BytesIO()
+    pacsv.write_csv(batch, buf, _CSV_OPTIONS)
+    return buf.getvalue()
+
+
+class _CSVReader:
+    """File-like view over CSV chunks, for psycopg2's copy_expert."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._buf = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buf) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buf += chunk
+        if size < 0:
+            out, self._buf = self._buf, b""
+        else:
+            out, self._buf = self._buf[:size], self._buf[size:]
+        return out
+
+
+def copy_batches(engine: Engine, tname: str, columns: list[str], batches: Iterable[pa.RecordBatch]) -> None:
+    """Bulk-load record batches into an existing table with COPY ... FROM STDIN (psycopg 3 or psycopg2)."""
+    column_list = ", ".join('"' + c.replace('"', '""') + '"' for c in columns)
+    sql = f'COPY "{tname}" ({column_list}) FROM STDIN WITH (FORMAT CSV)'
+    chunks = (_csv_bytes(batch) for batch in batches if batch.num_rows)
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        if hasattr(cur, "copy"):
+            with cur.copy(sql) as copy:
+                for chunk in chunks:
+                    copy.write(chunk)
+        else:
+            cur.copy_expert(sql, _CSVReader(chunks))
+        cur.close()
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def parquet_columns(pf: pq.ParquetFile) -> list[str]:
+    """Data column names of a parquet file; stored pandas index columns are left out (to_sql(index=False) never wrote them)."""
+    pandas_meta = pf.schema_arrow.pandas_metadata or {}
+    index_columns = {c for c in pandas_meta.get("index_columns", []) if isinstance(c, str)}
+    return [c for c in pf.schema_arrow.names if c not in index_columns]
+
+
+def _create_table(engine: Engine, tname: str, sample: pd.DataFrame) -> None:
+    """(Re)create tname with the column types to_sql would pick for these rows, without inserting them."""
+    ddl = pd.io.sql.get_schema(sample, tname, con=engine)
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP TABLE IF EXISTS "{tname}"'))
+        conn.exec_driver_sql(ddl)
+
+
+def copy_parquet(engine: Engine, tname: str, parquet_file: Path, batch_size: int = COPY_BATCH_SIZE) -> int:
+    """
+    (Re)create tname and load a parquet file into it with COPY, streaming record batches:
+    memory stays at one batch instead of the whole table. Returns the row count.
+    """
+    pf = pq.ParquetFile(parquet_file, memory_map=True)
+    columns = parquet_columns(pf)
+    batches = pf.iter_batches(batch_size=batch_size, columns=columns)
+    first = next(batches, None)
+    sample = pa.Table.from_batches([first]) if first is not None else pf.schema_arrow.empty_table().select(columns)
+    _create_table(engine, tname, sample.slice(0, _TYPE_SAMPLE_ROWS).to_pandas())
+    if first is not None:
+        copy_batches(engine, tname, columns, itertools.chain([first], batches))
+    return pf.metadata.num_rows
+
+
+def copy_parquet_tables(
+    engine: Engine,
+    parquet_files: list[Path],
+    reset: bool = True,
+    parallelism: int = DEFAULT_PROVISION_PARALLELISM,
+) -> list[tuple[str, int]]:
+    """
+    Load each parquet file into the table named after it; returns [(table, rows)] in file order.
+    Tables are independent, so up to `parallelism` COPYs run at once on their own pooled connections.
+    With reset, existing tables are dropped (CASCADE) first, one at a time, so dependent drops cannot deadlock.
+    """
+    if reset:
+        with engine.begin() as conn:
+            for parquet_file in parquet_files:
+                conn.execute(text(f'DROP TABLE IF EXISTS "{parquet_file.stem}" CASCADE'))
+
+    def load(parquet_file: Path) -> tuple[str, int]:
+        return parquet_file.stem, copy_parquet(engine, parquet_file.stem, parquet_file)
+
+    workers = min(parallelism, len(parquet_files))
+    if workers <= 1:
+        return [load(f) for f in parquet_files]
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(load, parquet_files))
+
+
+def smoke_counts(engine: Engine, tables: list[str]) -> dict[str, int]:
+    """Row count of every table in one UNION ALL round-trip."""
+    if not tables:
+        return {}
+    sql = " UNION ALL ".join(
+        f"SELECT {i} AS i, COUNT(*) AS n FROM \"{t}\"" for i, t in enumerate(tables)
+    )
+    with engine.connect() as conn:
+        return {tables[i]: n for i, n in conn.execute(text(sql)).all()}
+
+
+def provision_engine(connection_string: str, parallelism: int = DEFAULT_PROVISION_PARALLELISM) -> Engine:
+    """Target engine with one pooled connection per parallel table load."""
+    return create_engine(connection_string, pool_pre_ping=True, pool_size=max(1, parallelism), max_overflow=0)
+
 
 def run_provision(
     dataset_version_id: str,
@@ -19,6 +158,7 @@ def run_provision(
     reset_env: bool = True,
     run_smoke_tests: bool = True,
     job_id: str | None = None,
+    parallelism: int = DEFAULT_PROVISION_PARALLELISM,
 ) -> dict:
     db = SessionLocal()
     try:
@@ -73,24 +213,16 @@ def run_provision(
             db.commit()
             return {"job_id": job_id, "status": "failed"}
 
-        engine = create_engine(connection_string, pool_pre_ping=True)
+        engine = provision_engine(connection_string, parallelism)
         tables_loaded = []
         row_counts = {}
         try:
-            for parquet_file in parquet_files:
-                tname = parquet_file.stem
-                df = pd.read_parquet(parquet_file)
-                with engine.connect() as conn:
-                    conn.execute(text(f'DROP TABLE IF EXISTS "{tname}" CASCADE'))
-                    conn.commit()
-                df.to_sql(tname, engine, if_exists="replace", index=False, method="multi", chunksize=1000)
+            for tname, rows in copy_parquet_tables(engine, parquet_files, parallelism=parallelism):
                 tables_loaded.append(tname)
-                row_counts[tname] = len(df)
-                log(f"Loaded {tname}: {len(df)} rows", "completed", {"table": tname, "rows": len(df)})
+                row_counts[tname] = rows
+                log(f"Loaded {tname}: {rows} rows", "completed", {"table": tname, "rows": rows})
             if run_smoke_tests:
-                for t in tables_loaded:
-                    with engine.connect() as conn:
-                        r = conn.execute(text(f'SELECT COUNT(*) FROM "{t}"')).scalar()
+                for t, r in smoke_counts(engine, tables_loaded).items():
                     log(f"Smoke check {t}: {r} rows")
             db.add(Lineage(source_type="dataset_version", source_id=dataset_version_id, target_type="environment", target_id=target_env, operation="provision", job_id=job_id))
             job.status = "completed"
@@ -3,16 +3,21 @@ Phase 6: Provisioning Enhancements.
 Schema evolution detection, migration script generator, table-by-table control, incremental updates.
 """
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Any, Optional
-import pandas as pd
-from sqlalchemy import create_engine, text, inspect
+import pyarrow.parquet as pq
+from sqlalchemy import create_engine, inspect
 
 from config import settings
 from dataset_store import get_dataset_dir
+from services.provisioning import DEFAULT_PROVISION_PARALLELISM, copy_parquet_tables, parquet_columns, provision_engine
 
 logger = logging.getLogger("tdm.provisioning")
 
+# Parquet footers read concurrently during schema evolution detection
+FOOTER_READ_WORKERS = 16
+
 
 def detect_schema_evolution(
     target_connection: str,
@@ -26,15 +31,17 @@ def detect_schema_evolution(
     if not base_dir.exists():
         return {"error": "Dataset not found"}
     parquet_files = list(base_dir.glob("*.parquet"))
-    dataset_tables = {f.stem: pd.read_parquet(f, columns=[]).columns.tolist() for f in parquet_files}
+    # Column names from the parquet footers (IO-bound, so read in parallel); no data is read
+    with ThreadPoolExecutor(max_workers=FOOTER_READ_WORKERS) as ex:
+        dataset_tables = dict(ex.map(lambda f: (f.stem, parquet_columns(pq.ParquetFile(f))), parquet_files))
 
     engine = create_engine(target_connection, pool_pre_ping=True)
     inspector = inspect(engine)
-    target_tables = inspector.get_table_names()
-    target_schema = {}
-    for t in target_tables:
-        cols = [c["name"] for c in inspector.get_columns(t)]
-        target_schema[t] = cols
+    # Every table's columns in one catalog query instead of one round-trip per table
+    target_schema = {
+        t: [c["name"] for c in cols]
+        for (_, t), cols in inspector.get_multi_columns().items()
+    }
 
     new_tables = [t for t in dataset_tables if t not in target_schema]
     dropped_tables = [t for t in target_schema if t not in dataset_tables]
@@ -76,8 +83,9 @@ def provision_table_by_table(
     target_connection: str,
     tables_to_provision: Optional[List[str]] = None,
     reset_env: bool = True,
+    parallelism: int = DEFAULT_PROVISION_PARALLELISM,
 ) -> Dict[str, Any]:
-    """Provision only specified tables (table-by-table control)."""
+    """Provision only specified tables (table-by-table control); up to `parallelism` tables load at once."""
     base_dir = get_dataset_dir(dataset_version_id)
     if not base_dir.exists():
         return {"error": "Dataset not found", "tables_loaded": []}
@@ -86,18 +94,11 @@ def provision_table_by_table(
         parquet_files = [f for f in parquet_files if f.stem in tables_to_provision]
     tables_loaded = []
     row_counts = {}
-    engine = create_engine(target_connection, pool_pre_ping=True)
+    engine = provision_engine(target_connection, parallelism)
     try:
-        for pf in parquet_files:
-            tname = pf.stem
-            df = pd.read_parquet(pf)
-            with engine.connect() as conn:
-                if reset_env:
-                    conn.execute(text(f'DROP TABLE IF EXISTS "{tname}" CASCADE'))
-                    conn.commit()
-            df.to_sql(tname, engine, if_exists="replace", index=False, method="multi", chunksize=1000)
+        for tname, rows in copy_parquet_tables(engine, parquet_files, reset=reset_env, parallelism=parallelism):
+            row_counts[tname] = rows
             tables_loaded.append(tname)
-            row_counts[tname] = len(df)
         engine.dispose()
         return {"tables_loaded": tables_loaded, "row_counts": row_counts}
     except Exception as e:
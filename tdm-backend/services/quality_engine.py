@@ -11,44 +11,96 @@ logger = logging.getLogger("tdm.quality")
 try:
     import numpy as np
     import pandas as pd
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
     from scipy import stats
+    from scipy.special import rel_entr
+    from services.provisioning import parquet_columns
     NUMPY_AVAILABLE = True
 except ImportError:
     NUMPY_AVAILABLE = False
 
 
-def _safe_kl_divergence(p: List[float], q: List[float]) -> float:
-    """KL divergence with smoothing to avoid log(0)."""
+def _safe_kl_divergence(p: "List[float] | np.ndarray", q: "List[float] | np.ndarray") -> float:
+    """KL divergence with smoothing to avoid log(0). Accepts lists or float arrays."""
     if not NUMPY_AVAILABLE:
         return 0.0
     try:
-        p_arr = np.array(p, dtype=float) + 1e-10
-        q_arr = np.array(q, dtype=float) + 1e-10
-        p_arr = p_arr / p_arr.sum()
-        q_arr = q_arr / q_arr.sum()
-        return float(np.sum(p_arr * np.log(p_arr / q_arr)))
+        p_arr = np.asarray(p, dtype=np.float64) + 1e-10
+        q_arr = np.asarray(q, dtype=np.float64) + 1e-10
+        p_arr /= p_arr.sum()
+        q_arr /= q_arr.sum()
+        # rel_entr computes p * log(p / q) elementwise in one C loop
+        return float(rel_entr(p_arr, q_arr).sum())
     except Exception:
         return 0.0
 
 
+# Wider tables are compared on an evenly spaced subset of this many numeric columns
+MAX_CORRELATION_COLUMNS = 256
+
+
+def _correlation_matrix(df: "pd.DataFrame", cols: List[str]) -> "np.ndarray":
+    """Pearson correlations as Z.T @ Z / n over float32 z-scores; NaNs and constant columns count as 0."""
+    x = df[cols].to_numpy(dtype=np.float32, na_value=np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = (x - np.nanmean(x, axis=0)) / np.nanstd(x, axis=0)
+    z = np.nan_to_num(z, nan=0.0, posinf=0.0, neginf=0.0)
+    return (z.T @ z) / max(len(z), 1)
+
+
 def _correlation_similarity(df1: "pd.DataFrame", df2: "pd.DataFrame", numeric_cols: List[str]) -> float:
     """Correlation matrix similarity (1 - mean absolute difference)."""
     if not NUMPY_AVAILABLE or not numeric_cols:
         return 1.0
     try:
-        c1 = df1[numeric_cols].corr().fillna(0).values
-        c2 = df2[numeric_cols].corr().fillna(0).values
-        diff = np.abs(c1 - c2)
+        cols = list(numeric_cols)
+        if len(cols) > MAX_CORRELATION_COLUMNS:
+            step = -(-len(cols) // MAX_CORRELATION_COLUMNS)
+            cols = cols[::step]
+        diff = np.abs(_correlation_matrix(df1, cols) - _correlation_matrix(df2, cols))
         return max(0, 1 - float(np.mean(diff)))
     except Exception:
         return 1.0
 
 
-def _null_ratio_check(df: "pd.DataFrame") -> str:
-    """Check if null ratio is acceptable (< 50%)."""
-    if df is None or df.empty:
-        return "ok"
-    null_pct = df.isnull().sum().sum() / (len(df) * len(df.columns)) if len(df.columns) > 0 else 0
+def _parquet_null_ratio(pqf: "pq.ParquetFile") -> Optional[float]:
+    """
+    Null ratio over all data cells from the row-group null_count statistics (no data is read).
+    None when any column chunk lacks a null count.
+    """
+    meta = pqf.metadata
+    columns = parquet_columns(pqf)
+    if meta.num_rows == 0 or not columns:
+        return 0.0
+    wanted = set(columns)
+    nulls = 0
+    for i in range(meta.num_row_groups):
+        rg = meta.row_group(i)
+        for j in range(rg.num_columns):
+            col = rg.column(j)
+            if col.path_in_schema not in wanted:
+                continue
+            stats = col.statistics
+            if stats is None or not stats.has_null_count:
+                return None
+            nulls += stats.null_count
+    return nulls / (meta.num_rows * len(columns))
+
+
+def _null_ratio_check(pf_path: Path) -> str:
+    """
+    Check if null ratio is acceptable (< 50%). Uses the footer statistics; only when they are
+    missing is the table read, and nulls (and NaNs, as pandas' isnull) are counted with pyarrow.compute.
+    """
+    pqf = pq.ParquetFile(pf_path)
+    null_pct = _parquet_null_ratio(pqf)
+    if null_pct is None:
+        columns = parquet_columns(pqf)
+        table = pqf.read(columns=columns)
+        cells = table.num_rows * len(columns)
+        nulls = sum(pc.sum(pc.is_null(col, nan_is_null=True)).as_py() or 0 for col in table.columns)
+        null_pct = nulls / cells if cells else 0
     return "ok" if null_pct < 0.5 else "warning"
 
 
@@ -82,8 +134,7 @@ def compute_quality_score(
             parquet_files = list(base_dir.glob("*.parquet"))
             for pf in parquet_files[:5]:  # Limit to 5 tables
                 try:
-                    df = pd.read_parquet(pf)
-                    nr = _null_ratio_check(df)
+                    nr = _null_ratio_check(pf)
                     report["null_ratio_check"] = nr
                     scores.append(90 if nr == "ok" else 70)
                     # Type consistency: check dtypes
@@ -110,6 +161,11 @@ def detect_drift(
     if not real_dist or not synthetic_dist:
         return 0.0
     all_keys = set(real_dist) | set(synthetic_dist)
+    if NUMPY_AVAILABLE:
+        # Both distributions aligned on the union of categories, summed as arrays
+        r = np.fromiter((real_dist.get(k, 0.0) for k in all_keys), dtype=np.float64, count=len(all_keys))
+        s = np.fromiter((synthetic_dist.get(k, 0.0) for k in all_keys), dtype=np.float64, count=len(all_keys))
+        return min(1.0, float(np.abs(r - s).sum()) / 2)
     drift = 0.0
     for k in all_keys:
         r = real_dist.get(k, 0.0)
@@ -25,6 +25,35 @@ def _get_connection_id_or_create(db: Session, name: str, connection_string: str)
     return conn.id
 
 
+def _row_counts(engine: Engine, tables: list[tuple[str, str]], sample_size: int) -> dict[tuple[str, str], int]:
+    """
+    Row counts for (schema, table) keys. Planner estimates (pg_class.reltuples) come from one query;
+    tables estimated at or below sample_size, or never analyzed, get an exact COUNT(*) on the same connection.
+    """
+    counts = {}
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT n.nspname, c.relname, c.reltuples::bigint FROM pg_class c "
+                "JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE c.relkind IN ('r', 'p') AND n.nspname = ANY(:schemas)"
+            ),
+            {"schemas": sorted({s for s, _ in tables})},
+        ).all()
+        estimates = {(s, t): n for s, t, n in rows}
+        for schema_ns, tname in tables:
+            estimate = estimates.get((schema_ns, tname), -1)
+            if estimate is not None and estimate > sample_size:
+                counts[(schema_ns, tname)] = estimate
+                continue
+            try:
+                counts[(schema_ns, tname)] = conn.execute(text(f'SELECT COUNT(*) FROM "{schema_ns}"."{tname}"')).scalar()
+            except Exception as e:
+                logger.warning("Count failed for %s.%s: %s", schema_ns, tname, e)
+                conn.rollback()
+    return counts
+
+
 def run_discovery(
     connection_string: str,
     schemas: list[str],
@@ -54,67 +83,64 @@ def run_discovery(
         db.refresh(sv)
         schema_version_id = sv.id
 
-        tables_list = []
+        # Columns and FKs for every table of a schema in one reflection query each, not one per table
+        columns_by_key = {}
+        fks_by_key = {}
         for schema in schemas:
-            for tname in inspector.get_table_names(schema=schema):
-                tables_list.append((schema, tname))
+            columns_by_key.update(inspector.get_multi_columns(schema=schema))
+            fks_by_key.update(inspector.get_multi_foreign_keys(schema=schema))
+        tables_list = list(columns_by_key)
 
-        table_id_by_key = {}
-        for schema_ns, tname in tables_list:
-            row_count = None
-            if include_stats:
-                try:
-                    with engine.connect() as conn:
-                        r = conn.execute(text(f'SELECT COUNT(*) FROM "{schema_ns}"."{tname}"')).scalar()
-                    if r and r > sample_size:
-                        row_count = r
-                    else:
-                        row_count = r
-                except Exception as e:
-                    logger.warning("Count failed for %s.%s: %s", schema_ns, tname, e)
-            t = TableMeta(schema_version_id=str(schema_version_id), name=tname, schema_name=schema_ns, row_count=row_count)
-            db.add(t)
-            db.flush()
-            table_id_by_key[(schema_ns, tname)] = str(t.id)
+        row_counts = _row_counts(engine, tables_list, sample_size) if include_stats and tables_list else {}
+        table_rows = {
+            key: TableMeta(schema_version_id=str(schema_version_id), name=key[1], schema_name=key[0], row_count=row_counts.get(key))
+            for key in tables_list
+        }
+        db.add_all(table_rows.values())
+        db.flush()
+        table_id_by_key = {key: str(t.id) for key, t in table_rows.items()}
 
+        column_rows = {}
         for (schema_ns, tname), table_id in table_id_by_key.items():
-            for col in inspector.get_columns(tname, schema=schema_ns):
-                c = ColumnMeta(
+            column_rows[table_id] = [
+                ColumnMeta(
                     table_id=str(table_id),
                     name=col["name"],
                     data_type=str(col.get("type", "")) if col.get("type") else None,
                     nullable=col.get("nullable", True),
                     ordinal_position=col.get("ordinal_position"),
                 )
-                db.add(c)
-            db.flush()
+                for col in columns_by_key[(schema_ns, tname)]
+            ]
+            db.add_all(column_rows[table_id])
+        db.flush()
+        # Column ids are assigned on flush; index them once for the FK pass instead of re-querying per FK
+        cols_by_tid = {tid: {c.name: str(c.id) for c in cols} for tid, cols in column_rows.items()}
         db.commit()
 
-        # Refresh to get column ids
+        relationships = []
         for (schema_ns, tname), table_id in table_id_by_key.items():
-            tbl = db.query(TableMeta).filter(TableMeta.id == table_id).first()
-            if not tbl:
-                continue
-            col_ids = {c.name: str(c.id) for c in tbl.columns}
-            for fk in inspector.get_foreign_keys(tname, schema=schema_ns):
-                parent_schema = fk.get("referred_schema") or schema_ns
+            col_ids = cols_by_tid[table_id]
+            for fk in fks_by_key.get((schema_ns, tname), []):
+                # referred_schema is None when the parent is in the connection's default schema
+                parent_schema = fk.get("referred_schema") or inspector.default_schema_name
                 parent_table = fk["referred_table"]
                 parent_key = (parent_schema, parent_table)
                 if parent_key not in table_id_by_key:
                     continue
+                parent_tid = table_id_by_key[parent_key]
+                parent_col_ids = cols_by_tid[parent_tid]
                 for uc, rc in zip(fk.get("constrained_columns", []), fk.get("referred_columns", [])):
                     child_col_id = col_ids.get(uc)
-                    parent_tid = table_id_by_key[parent_key]
-                    parent_tbl = db.query(TableMeta).filter(TableMeta.id == parent_tid).first()
-                    parent_col_id = {c.name: str(c.id) for c in parent_tbl.columns}.get(rc) if parent_tbl else None
+                    parent_col_id = parent_col_ids.get(rc)
                     if child_col_id and parent_col_id:
-                        rel = Relationship(
+                        relationships.append(Relationship(
                             parent_table_id=str(parent_tid),
                             child_table_id=str(table_id),
                             parent_column_id=str(parent_col_id),
                             child_column_id=str(child_col_id),
-                        )
-                        db.add(rel)
+                        ))
+        db.add_all(relationships)
         db.commit()
 
         return {
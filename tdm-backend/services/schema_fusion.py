@@ -53,17 +53,23 @@ def match_fields(
     - label similarity
     - semantic meaning
     """
+    names_a = [(fa.get("name") or "").lower() for fa in fields_a]
+    names_b = [(fb.get("name") or "").lower() for fb in fields_b]
+    # First field_b per name: an exact hit ends the scan for field_a there
+    exact_b = {}
+    for j, name_b in enumerate(names_b):
+        exact_b.setdefault(name_b, j)
+
     matches = []
-    for fa in fields_a:
-        name_a = (fa.get("name") or "").lower()
-        for fb in fields_b:
-            name_b = (fb.get("name") or "").lower()
-            if name_a == name_b:
-                matches.append({"field_a": fa, "field_b": fb, "score": 1.0})
-                break
+    for fa, name_a in zip(fields_a, names_a):
+        stop = exact_b.get(name_a, len(names_b))
+        for j in range(stop):
+            name_b = names_b[j]
             # Simple similarity: substring
             if name_a in name_b or name_b in name_a:
-                matches.append({"field_a": fa, "field_b": fb, "score": 0.7})
+                matches.append({"field_a": fa, "field_b": fields_b[j], "score": 0.7})
+        if stop < len(names_b):
+            matches.append({"field_a": fa, "field_b": fields_b[stop], "score": 1.0})
     return matches
 
 
@@ -98,18 +104,18 @@ def fuse_schemas(
             if not name:
                 continue
             if name not in seen_tables:
-                seen_tables[name] = {"name": name, "fields": [], "sources": [], "weight": weight}
+                seen_tables[name] = {"name": name, "fields": [], "sources": [], "weight": weight, "_field_names": set()}
             entry = seen_tables[name]
             for f in t.get("fields", []):
                 fn = f.get("name") if isinstance(f, dict) else f
-                if fn and not any(
-                    (x.get("name") if isinstance(x, dict) else x) == fn
-                    for x in entry["fields"]
-                ):
+                if fn and fn not in entry["_field_names"]:
+                    entry["_field_names"].add(fn)
                     entry["fields"].append(f if isinstance(f, dict) else {"name": fn, "type": "string"})
             if src_name not in entry.get("sources", []):
                 entry.setdefault("sources", []).append(src_name)
 
+    for entry in seen_tables.values():
+        entry.pop("_field_names")
     unified["tables"] = list(seen_tables.values())
     return unified
 
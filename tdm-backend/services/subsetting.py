@@ -1,44 +1,162 @@
 """Subset: FK-aware extract from source DB to parquet in dataset store."""
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from uuid import uuid4
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from pathlib import Path
 
 from config import settings
 from database import SessionLocal
 from models import (
     SchemaVersion, TableMeta, ColumnMeta, Relationship,
-    DatasetVersion, DatasetMetadata, Job, JobLog, Lineage,
+    DatasetVersion, DatasetMetadata, Job, Lineage,
 )
-from dataset_store import ensure_dataset_dir
+from dataset_store import ensure_dataset_dir, parquet_write_options
+from services.job_logs import JobLogBuffer
 
 logger = logging.getLogger(__name__)
 
+# Tables read from the source DB at once, and rows fetched per server-side cursor round-trip
+EXTRACT_WORKERS = 8
+READ_CHUNK_ROWS = 65_536
+# Tables encoded to parquet at once (Arrow releases the GIL while encoding and compressing)
+PARQUET_WRITE_WORKERS = 8
 
-def _build_fk_map(db: Session, schema_version_id: str) -> dict[str, list[tuple[str, str, str, str]]]:
-    """child_table -> [(parent_table, parent_col, child_col), ...]"""
-    sv = db.query(SchemaVersion).filter(SchemaVersion.id == schema_version_id).first()
-    if not sv:
+# One engine (and connection pool) per source connection string, kept across subset runs
+_source_engines: dict[str, Engine] = {}
+_source_engines_lock = threading.Lock()
+
+
+def _source_engine(connection_string: str) -> Engine:
+    with _source_engines_lock:
+        engine = _source_engines.get(connection_string)
+        if engine is None:
+            engine = create_engine(
+                connection_string,
+                pool_pre_ping=True,
+                pool_size=EXTRACT_WORKERS,
+                max_overflow=4,
+                pool_recycle=1800,
+            )
+            _source_engines[connection_string] = engine
+        return engine
+
+
+def _build_fk_map(db: Session, table_names: dict[str, str]) -> dict[str, list[tuple[str, str, str, str]]]:
+    """child_table -> [(parent_table, parent_col, child_col), ...] for the tables given as {table id: name}"""
+    if not table_names:
         return {}
-    table_by_id = {t.id: t for t in sv.tables_rel}
+    rels = db.query(
+        Relationship.parent_table_id, Relationship.child_table_id,
+        Relationship.parent_column_id, Relationship.child_column_id,
+    ).filter(
+        Relationship.parent_table_id.in_(list(table_names)),
+        Relationship.child_table_id.in_(list(table_names)),
+    ).all()
+    # Only the columns the relationships point at, in one query: (column id) -> (table id, name)
+    col_ids = {r.parent_column_id for r in rels} | {r.child_column_id for r in rels}
+    columns = {
+        cid: (tid, name)
+        for cid, tid, name in db.query(ColumnMeta.id, ColumnMeta.table_id, ColumnMeta.name)
+        .filter(ColumnMeta.id.in_(list(col_ids)))
+        .all()
+    } if col_ids else {}
     out = {}
-    for rel in db.query(Relationship).filter(
-        Relationship.parent_table_id.in_([t.id for t in sv.tables_rel]),
-        Relationship.child_table_id.in_([t.id for t in sv.tables_rel]),
-    ).all():
-        pt = table_by_id.get(rel.parent_table_id)
-        ct = table_by_id.get(rel.child_table_id)
-        if not pt or not ct:
-            continue
-        pc = next((c for c in pt.columns if c.id == rel.parent_column_id), None)
-        cc = next((c for c in ct.columns if c.id == rel.child_column_id), None)
-        if pc and cc:
-            out.setdefault(ct.name, []).append((pt.name, pc.name, cc.name))
+    for parent_tid, child_tid, parent_cid, child_cid in rels:
+        pc = columns.get(parent_cid)
+        cc = columns.get(child_cid)
+        if pc and cc and pc[0] == parent_tid and cc[0] == child_tid:
+            out.setdefault(table_names[child_tid], []).append((table_names[parent_tid], pc[1], cc[1]))
     return out
 
 
+def _to_arrow(df: pd.DataFrame) -> pa.Table:
+    """Arrow table for parquet; object columns (e.g. UUID) are stringified first so Arrow can type them."""
+    obj_cols = df.select_dtypes(include="object").columns
+    if len(obj_cols):
+        df = df.copy(deep=False)
+        for c in obj_cols:
+            df[c] = df[c].map(str, na_action="ignore")
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _write_tables(tables: dict[str, pa.Table], out_dir: Path) -> None:
+    """Write each table to out_dir/<table>.parquet on a thread pool; the first failure is raised."""
+    if not tables:
+        return
+    options = parquet_write_options()
+    with ThreadPoolExecutor(max_workers=min(PARQUET_WRITE_WORKERS, len(tables))) as ex:
+        futures = [ex.submit(pq.write_table, table, out_dir / f"{tname}.parquet", **options) for tname, table in tables.items()]
+        for f in as_completed(futures):
+            f.result()
+
+
+def _read_arrow(conn, sql, params: dict | None = None) -> pa.Table:
+    """
+    Query result as one Arrow table. Rows come from a server-side cursor READ_CHUNK_ROWS at a time and
+    each chunk is converted right away, so only one pandas chunk is resident next to the Arrow columns.
+    Row caps belong in the query's LIMIT.
+    """
+    chunks = [
+        _to_arrow(chunk)
+        for chunk in pd.read_sql(sql, conn.execution_options(stream_results=True), params=params, chunksize=READ_CHUNK_ROWS)
+    ]
+    # a column that is all null in one chunk is typed null there; permissive promotion unifies it
+    return pa.concat_tables(chunks, promote_options="permissive").combine_chunks()
+
+
+def _extract_root(engine, q: str, params: dict | None, root_table: str) -> tuple[pa.Table, tuple]:
+    with engine.connect() as conn:
+        table = _read_arrow(conn, text(q), params)
+    return table, (f"Root table {root_table}: {table.num_rows} rows",)
+
+
+def _extract_unrelated(engine, schema_ns: str, child_t: str, limit: int) -> tuple[pa.Table | None, tuple]:
+    """Whole table (up to limit) for a table without FK to the extracted set; failures only warn."""
+    try:
+        with engine.connect() as conn:
+            table = _read_arrow(conn, text(f'SELECT * FROM "{schema_ns}"."{child_t}" LIMIT {int(limit)}'))
+        return table, (f"Table {child_t}: {table.num_rows} rows (no FK)",)
+    except Exception as e:
+        return None, (f"Table {child_t} failed: {e}", "warning")
+
+
+def _extract_child(
+    engine, schema_ns: str, child_t: str, ccol: str, parent: Future, pcol: str, limit: int,
+) -> tuple[pa.Table | None, tuple | None]:
+    """Rows of child_t referencing the parent's extracted keys; skipped when the parent was not extracted."""
+    parent_table, _ = parent.result()
+    if parent_table is None:
+        return None, None
+    parent_ids = pc.unique(parent_table.column(pcol).drop_null()).to_pylist()
+    if not parent_ids:
+        return pa.table({}), None
+    child = f'"{schema_ns}"."{child_t}"'
+    with engine.connect() as conn:
+        # All keys go in as one array parameter, cast to the child column's type and joined on:
+        # one round trip however many keys there are
+        key_type = conn.execute(
+            text("SELECT format_type(atttypid, atttypmod) FROM pg_attribute WHERE attrelid = CAST(:rel AS regclass) AND attname = :col"),
+            {"rel": child, "col": ccol},
+        ).scalar_one()
+        table = _read_arrow(
+            conn,
+            text(
+                f'SELECT c.* FROM {child} c JOIN unnest(CAST(:ids AS {key_type}[])) AS f(id) ON c."{ccol}" = f.id '
+                f'LIMIT {int(limit)}'
+            ),
+            {"ids": parent_ids},
+        )
+    return table, (f"Table {child_t}: {table.num_rows} rows",)
+
+
 def run_subset(
     schema_version_id: str,
     connection_string: str,
@@ -48,6 +166,7 @@ def run_subset(
     job_id: str | None = None,
 ) -> dict:
     db = SessionLocal()
+    logs = None
     try:
         if not job_id:
             job = Job(operation="subset", status="running", request_json={"schema_version_id": schema_version_id})
@@ -60,11 +179,11 @@ def run_subset(
             if not job:
                 raise ValueError("Job not found")
 
-        def log(msg: str, level: str = "info"):
-            db.add(JobLog(job_id=job_id, level=level, message=msg))
-            db.commit()
+        logs = JobLogBuffer(db, job_id)
+        log = logs.log
 
         log("Starting subset extraction")
+        logs.flush()
         sv = db.query(SchemaVersion).filter(SchemaVersion.id == schema_version_id).first()
         if not sv:
             log("Schema version not found", "error")
@@ -72,10 +191,16 @@ def run_subset(
             db.commit()
             return {"job_id": job_id, "dataset_version_id": None}
 
-        engine = create_engine(connection_string, pool_pre_ping=True)
-        fk_map = _build_fk_map(db, schema_version_id)
-        table_names = [t.name for t in sv.tables_rel]
-        schema_ns = sv.tables_rel[0].schema_name if sv.tables_rel else "public"
+        engine = _source_engine(connection_string)
+        # id, name and schema are all that is needed per table: one projected query, shared with the FK map
+        tables = (
+            db.query(TableMeta.id, TableMeta.name, TableMeta.schema_name)
+            .filter(TableMeta.schema_version_id == schema_version_id)
+            .all()
+        )
+        fk_map = _build_fk_map(db, {t.id: t.name for t in tables})
+        table_names = [t.name for t in tables]
+        schema_ns = tables[0].schema_name if tables else "public"
 
         max_rows = max_rows_per_table or {}
         default_max = max_rows.get("*", 100_000)
@@ -83,69 +208,42 @@ def run_subset(
         extracted = {}
         if root_table not in table_names:
             root_table = table_names[0] if table_names else root_table
-        try:
-            filter_clause = ""
-            params = None
-            if filters and filters.get(root_table):
-                parts = [f'"{k}" = :{k}' for k in filters[root_table]]
-                filter_clause = " WHERE " + " AND ".join(parts) if parts else ""
-                params = filters[root_table]
-            limit = max_rows.get(root_table, default_max)
-            q = f'SELECT * FROM "{schema_ns}"."{root_table}"{filter_clause} LIMIT {limit}'
-            with engine.connect() as conn:
-                df = pd.read_sql(text(q), conn, params=params)
-            limit = max_rows.get(root_table, default_max)
-            if len(df) > limit:
-                df = df.head(limit)
-            extracted[root_table] = df
-            log(f"Root table {root_table}: {len(df)} rows")
-
+        filter_clause = ""
+        params = None
+        if filters and filters.get(root_table):
+            parts = [f'"{k}" = :{k}' for k in filters[root_table]]
+            filter_clause = " WHERE " + " AND ".join(parts) if parts else ""
+            params = filters[root_table]
+        q = f'SELECT * FROM "{schema_ns}"."{root_table}"{filter_clause} LIMIT {int(max_rows.get(root_table, default_max))}'
+        # The root and every related table are read concurrently on pooled connections;
+        # a child task waits only for its own parent's table
+        with ThreadPoolExecutor(max_workers=EXTRACT_WORKERS) as ex:
+            futures = {root_table: ex.submit(_extract_root, engine, q, params, root_table)}
             for child_t in table_names:
                 if child_t == root_table:
                     continue
                 deps = fk_map.get(child_t, [])
+                limit = max_rows.get(child_t, default_max)
                 if not deps:
-                    try:
-                        with engine.connect() as conn:
-                            edf = pd.read_sql(f'SELECT * FROM "{schema_ns}"."{child_t}"', conn)
-                        if len(edf) > max_rows.get(child_t, default_max):
-                            edf = edf.head(max_rows.get(child_t, default_max))
-                        extracted[child_t] = edf
-                        log(f"Table {child_t}: {len(edf)} rows (no FK)")
-                    except Exception as e:
-                        log(f"Table {child_t} failed: {e}", "warning")
+                    futures[child_t] = ex.submit(_extract_unrelated, engine, schema_ns, child_t, limit)
                     continue
                 parent_t, pcol, ccol = deps[0]
-                if parent_t not in extracted:
-                    continue
-                parent_ids = extracted[parent_t][pcol].dropna().unique()
-                if len(parent_ids) == 0:
-                    extracted[child_t] = pd.DataFrame()
+                if parent_t not in futures:
                     continue
-                placeholders = ",".join([str(int(x)) if isinstance(x, (int, float)) else f"'{x}'" for x in parent_ids[:10000]])
-                with engine.connect() as conn:
-                    edf = pd.read_sql(
-                        f'SELECT * FROM "{schema_ns}"."{child_t}" WHERE "{ccol}" IN ({placeholders})',
-                        conn,
-                    )
-                limit = max_rows.get(child_t, default_max)
-                if len(edf) > limit:
-                    edf = edf.head(limit)
-                extracted[child_t] = edf
-                log(f"Table {child_t}: {len(edf)} rows")
-        finally:
-            engine.dispose()
+                futures[child_t] = ex.submit(
+                    _extract_child, engine, schema_ns, child_t, ccol, futures[parent_t], pcol, limit
+                )
+            for tname, future in futures.items():
+                table, msg = future.result()
+                if table is not None:
+                    extracted[tname] = table
+                if msg:
+                    log(*msg)
 
         version_id = str(uuid4())
         path_prefix = str(Path(settings.dataset_store_path) / version_id)
         ensure_dataset_dir(version_id)
-        for tname, df in extracted.items():
-            # Convert object columns (e.g. UUID) to string so Arrow/Parquet can write them
-            for c in df.columns:
-                if df[c].dtype == object or str(df[c].dtype) == "object":
-                    df[c] = df[c].apply(lambda x: str(x) if x is not None else None)
-            fp = Path(settings.dataset_store_path) / version_id / f"{tname}.parquet"
-            df.to_parquet(fp, index=False)
+        _write_tables(extracted, Path(settings.dataset_store_path) / version_id)
 
         dv = DatasetVersion(
             id=version_id,
@@ -157,18 +255,21 @@ def run_subset(
         )
         db.add(dv)
         db.flush()  # ensure dataset_versions row exists before dataset_metadata (FK)
-        row_counts = {t: int(len(df)) for t, df in extracted.items()}
-        for k, v in row_counts.items():
-            dm = DatasetMetadata(dataset_version_id=version_id, meta_key=f"row_count_{k}", meta_value=v)
-            db.add(dm)
-        db.add(DatasetMetadata(dataset_version_id=version_id, meta_key="row_counts", meta_value=row_counts))
+        row_counts = {t: table.num_rows for t, table in extracted.items()}
+        # All metadata rows in one executemany (batched into multi-row INSERTs) instead of one ORM object each
+        metadata_rows = [
+            {"dataset_version_id": version_id, "meta_key": f"row_count_{k}", "meta_value": v}
+            for k, v in row_counts.items()
+        ]
+        metadata_rows.append({"dataset_version_id": version_id, "meta_key": "row_counts", "meta_value": row_counts})
+        db.execute(insert(DatasetMetadata), metadata_rows)
         db.add(Lineage(source_type="schema_version", source_id=schema_version_id, target_type="dataset_version", target_id=version_id, operation="subset", job_id=job_id))
         from datetime import datetime
         job.status = "completed"
         job.result_json = {"dataset_version_id": version_id, "row_counts": row_counts}
         job.finished_at = datetime.utcnow()
         log("Subset completed")
-        db.commit()
+        logs.flush()
         return {"job_id": job_id, "dataset_version_id": version_id, "row_counts": row_counts}
     except Exception as e:
         logger.exception("Subset failed")
@@ -179,8 +280,7 @@ def run_subset(
                 if job:
                     job.status = "failed"
                     job.result_json = {"error": str(e)}
-                    db.add(JobLog(job_id=job_id, level="error", message=str(e)))
-                    db.commit()
+                    (logs or JobLogBuffer(db, job_id)).log(str(e), "error")
             except Exception:
                 pass
         raise
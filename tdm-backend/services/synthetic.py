@@ -1,14 +1,20 @@
-"""Generate synthetic dataset from schema version (Faker + pandas)."""
+"""Generate synthetic dataset from schema version (Faker + NumPy, written with Arrow)."""
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from uuid import uuid4
 from pathlib import Path
 from datetime import datetime
-import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from database import SessionLocal
-from models import SchemaVersion, TableMeta, DatasetVersion, DatasetMetadata, Job, JobLog, Lineage
+from models import SchemaVersion, TableMeta, DatasetVersion, DatasetMetadata, Job, Lineage
 from config import settings
-from dataset_store import ensure_dataset_dir
+from dataset_store import ensure_dataset_dir, parquet_write_options
+from services.job_logs import JobLogBuffer
+from services.process_pool import process_pool_workers, spawn_executor
 
 logger = logging.getLogger(__name__)
 
@@ -19,32 +25,118 @@ except ImportError:
     fake = None
 
 
-def _fake_value(col_name: str, data_type: str, inferred: str):
+# Tables encoded to parquet at once while the next table is generated
+PARQUET_WRITE_WORKERS = 8
+_rng = np.random.default_rng()
+
+
+_faker_pools: dict[str, np.ndarray] = {}
+_faker_pools_lock = threading.Lock()
+
+
+def _faker_values(method: str, n: int) -> np.ndarray:
+    """
+    At least min(n, settings.synthetic_pool_size) values of fake.<method>(), cached per process.
+    The pool grows on demand, so small tables never pay for the full pool.
+    """
+    want = min(n, settings.synthetic_pool_size)
+    pool = _faker_pools.get(method)
+    if pool is not None and len(pool) >= want:
+        return pool
+    with _faker_pools_lock:
+        pool = _faker_pools.get(method, np.empty(0, dtype=object))
+        extra = want - len(pool)
+        if extra > 0:
+            if method == "word":
+                values = fake.words(nb=extra)
+            else:
+                gen = getattr(fake, method)
+                values = [gen() for _ in range(extra)]
+            pool = np.concatenate([pool, np.array(values, dtype=object)])
+            _faker_pools[method] = pool
+        return pool
+
+
+def _fake_pool(method: str, n: int) -> np.ndarray:
+    """n cells sampled from the cached fake.<method>() pool."""
+    if n == 0:
+        return np.empty(0, dtype=object)
+    return _rng.choice(_faker_values(method, n), size=n)
+
+
+def _random_isoformat(n: int, unit: str) -> np.ndarray:
+    """n ISO strings between the epoch and now, at day ("D") or second ("s") resolution."""
+    now = np.datetime64(datetime.utcnow(), unit)
+    span = (now - np.datetime64(0, unit)).astype(np.int64)
+    return (np.datetime64(0, unit) + _rng.integers(0, span, size=n)).astype(str).astype(object)
+
+
+def _fake_column(col_name: str, data_type: str, inferred: str, n: int) -> np.ndarray:
+    """n values for one column, generated with array operations rather than per cell."""
+    name = col_name.lower()
     if inferred:
         inferred = inferred.lower()
-        if "email" in inferred or col_name.lower() == "email":
-            return fake.email() if fake else "user@example.com"
-        if "phone" in inferred or "phone" in col_name.lower():
-            return fake.phone_number() if fake else "+1555000000"
-        if "name" in inferred or "name" in col_name.lower():
-            return fake.name() if fake else "Unknown"
-        if "address" in inferred or "address" in col_name.lower():
-            return fake.address() if fake else "123 Main St"
-        if "date" in inferred or "date" in col_name.lower():
-            return fake.date_isoformat() if fake else "2024-01-01"
+        if "email" in inferred or name == "email":
+            return _fake_pool("email", n) if fake else np.full(n, "user@example.com", dtype=object)
+        if "phone" in inferred or "phone" in name:
+            return _fake_pool("phone_number", n) if fake else np.full(n, "+1555000000", dtype=object)
+        if "name" in inferred or "name" in name:
+            return _fake_pool("name", n) if fake else np.full(n, "Unknown", dtype=object)
+        if "address" in inferred or "address" in name:
+            return _fake_pool("address", n) if fake else np.full(n, "123 Main St", dtype=object)
+        if "date" in inferred or "date" in name:
+            return _random_isoformat(n, "D") if fake else np.full(n, "2024-01-01", dtype=object)
     if data_type:
         dt = str(data_type).upper()
         if "UUID" in dt:
-            return str(uuid4()) if fake else "00000000-0000-0000-0000-000000000000"
+            if not fake:
+                return np.full(n, "00000000-0000-0000-0000-000000000000", dtype=object)
+            return np.array([str(uuid4()) for _ in range(n)], dtype=object)
         if "INT" in dt or "SERIAL" in dt or "BIGINT" in dt:
-            return fake.random_int(1, 1000000) if fake else 1
+            return _rng.integers(1, 1000001, size=n) if fake else np.ones(n, dtype=np.int64)
         if "BOOL" in dt:
-            return fake.boolean() if fake else False
+            return _rng.integers(0, 2, size=n, dtype=np.bool_) if fake else np.zeros(n, dtype=bool)
         if "DATE" in dt or "TIME" in dt:
-            return fake.iso8601() if fake else "2024-01-01T00:00:00"
+            return _random_isoformat(n, "s") if fake else np.full(n, "2024-01-01T00:00:00", dtype=object)
         if "CHAR" in dt or "TEXT" in dt or "VARCHAR" in dt:
-            return fake.word() if fake else "value"
-    return fake.word() if fake else "value"
+            return _fake_pool("word", n) if fake else np.full(n, "value", dtype=object)
+    return _fake_pool("word", n) if fake else np.full(n, "value", dtype=object)
+
+
+def _pk_column(cols: list[tuple]) -> str:
+    """Column filled with 1..n: the last int/serial column named like an id or pk, else the first column."""
+    for cname, dtype, _ in reversed(cols):
+        dstr = str(dtype or "").lower()
+        name = cname.lower()
+        if ("int" in dstr or "serial" in dstr) and ("id" in name or "pk" in name):
+            return cname
+    return cols[0][0]
+
+
+def _generate_table(cols: list[tuple], n: int) -> tuple[pa.Table, str]:
+    """n synthetic rows for (name, data_type, inferred_type) columns; returns the table and its PK column."""
+    pk_col = _pk_column(cols)
+    data = {}
+    for cname, dtype, inferred in cols:
+        if cname == pk_col:
+            # sequential keys; nothing random is generated for this column
+            data[cname] = np.arange(1, n + 1, dtype=np.int64)
+            continue
+        try:
+            data[cname] = _fake_column(cname, str(dtype or ""), str(inferred or ""), n)
+        except Exception as e:
+            logger.warning("Column %s: %s", cname, e)
+            data[cname] = ["value"] * n
+    # Columns are already typed arrays: straight to Arrow (one chunk each), no DataFrame in between
+    return pa.table(data), pk_col
+
+
+def _generate_and_write(task: tuple) -> tuple[str, int, str]:
+    """Worker entry point: generate one table and write its parquet file. Returns (table, rows, pk column)."""
+    name, cols, n, fp = task
+    table, pk_col = _generate_table(cols, n)
+    pq.write_table(table, fp, **parquet_write_options())
+    return name, n, pk_col
 
 
 def run_synthetic(
@@ -53,6 +145,7 @@ def run_synthetic(
     job_id: str | None = None,
 ) -> dict:
     db = SessionLocal()
+    logs = None
     try:
         if not job_id:
             job = Job(operation="synthetic", status="running", request_json={"schema_version_id": schema_version_id})
@@ -63,11 +156,11 @@ def run_synthetic(
         else:
             job = db.query(Job).get(job_id)
 
-        def log(msg: str, level: str = "info"):
-            db.add(JobLog(job_id=job_id, level=level, message=msg))
-            db.commit()
+        logs = JobLogBuffer(db, job_id)
+        log = logs.log
 
         log("Starting synthetic generation")
+        logs.flush()
         sv = db.query(SchemaVersion).filter(SchemaVersion.id == schema_version_id).first()
         if not sv:
             log("Schema version not found", "error")
@@ -82,33 +175,31 @@ def run_synthetic(
         out_path = Path(settings.dataset_store_path) / version_id
         generated = {}
         pk_columns = {}  # table -> pk col name for FK refs
-        for table in sv.tables_rel:
-            n = row_counts.get(table.name, default_rows)
-            cols = [(c.name, c.data_type, c.inferred_type) for c in table.columns]
-            if not cols:
-                continue
-            data = {}
-            pk_col = None
-            for cname, dtype, inferred in cols:
-                dstr = str(dtype or "").lower()
-                if ("int" in dstr or "serial" in dstr) and ("id" in cname.lower() or "pk" in cname.lower()):
-                    pk_col = cname
-                try:
-                    data[cname] = [_fake_value(cname, str(dtype or ""), str(inferred or "")) for _ in range(n)]
-                except Exception as e:
-                    logger.warning("Column %s: %s", cname, e)
-                    data[cname] = ["value"] * n
-            if pk_col and pk_col not in data:
-                pk_col = None
-            if not pk_col and cols:
-                pk_col = cols[0][0]
-            if pk_col:
-                data[pk_col] = list(range(1, n + 1))
-            pk_columns[table.name] = pk_col
-            df = pd.DataFrame(data)
-            df.to_parquet(out_path / f"{table.name}.parquet", index=False)
-            generated[table.name] = n
-            log(f"Generated {table.name}: {n} rows")
+        tasks = [
+            (table.name, [(c.name, c.data_type, c.inferred_type) for c in table.columns], row_counts.get(table.name, default_rows))
+            for table in sv.tables_rel
+        ]
+        tasks = [(name, cols, n, out_path / f"{name}.parquet") for name, cols, n in tasks if cols]
+        workers = process_pool_workers([n for _, _, n, _ in tasks])
+        if workers:
+            # Large jobs: tables are independent and generation is CPU-bound, so use processes, not threads.
+            with spawn_executor(workers) as ex:
+                results = list(ex.map(_generate_and_write, tasks))
+        else:
+            # One core or a small job: generate here and overlap parquet encoding (GIL released in Arrow) on a thread pool
+            results = []
+            with ThreadPoolExecutor(max_workers=PARQUET_WRITE_WORKERS) as writer:
+                writes = []
+                for name, cols, n, fp in tasks:
+                    table, pk_col = _generate_table(cols, n)
+                    writes.append(writer.submit(pq.write_table, table, fp, **parquet_write_options()))
+                    results.append((name, n, pk_col))
+                for f in as_completed(writes):
+                    f.result()
+        for name, n, pk_col in results:
+            pk_columns[name] = pk_col
+            generated[name] = n
+            log(f"Generated {name}: {n} rows")
 
         path_prefix = str(out_path)
         dv = DatasetVersion(
@@ -127,7 +218,7 @@ def run_synthetic(
         job.result_json = {"dataset_version_id": version_id, "row_counts": generated}
         job.finished_at = datetime.utcnow()
         log("Synthetic generation completed")
-        db.commit()
+        logs.flush()
         return {"job_id": job_id, "dataset_version_id": version_id}
     except Exception as e:
         logger.exception("Synthetic failed")
@@ -138,8 +229,7 @@ def run_synthetic(
                 if job:
                     job.status = "failed"
                     job.result_json = {"error": str(e)}
-                    db.add(JobLog(job_id=job_id, level="error", message=str(e)))
-                    db.commit()
+                    (logs or JobLogBuffer(db, job_id)).log(str(e), "error")
             except Exception:
                 pass
         raise
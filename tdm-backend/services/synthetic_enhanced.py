@@ -1,18 +1,27 @@
 """Enhanced synthetic data generation with crawler support and dynamic scenarios."""
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor, wait
 from uuid import uuid4
 from pathlib import Path
 from datetime import datetime, timedelta
-import pandas as pd
-from typing import Dict, List, Any, Optional
-import random
+from functools import lru_cache, partial
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import selectinload
 
 from database import SessionLocal
-from models import SchemaVersion, TableMeta, DatasetVersion, DatasetMetadata, Job, JobLog, Lineage
+from models import SchemaVersion, TableMeta, DatasetVersion, DatasetMetadata, Job, Lineage
 from config import settings
-from dataset_store import ensure_dataset_dir
+from dataset_store import ensure_dataset_dir, parquet_write_options
 from services.crawler import TestCaseCrawler
+from services.job_logs import JobLogBuffer
+from services.process_pool import process_pool_workers, spawn_executor
+from services.synthetic import _fake_column, _faker_values
 
 logger = logging.getLogger(__name__)
 
@@ -22,12 +31,122 @@ try:
 except ImportError:
     fake = None
 
+# Phrasings that indicate form/data entry, checked in order on lowercased content
+_FORM_ENTRY_PATTERNS = [
+    (re.compile(r'(?:enter|input|type|fill)\s+\w+\s+as\s+'), "Enter X as Y"),
+    (re.compile(r'(?:enter|input|type|fill)\s+[\w\s]+\s+(?:in|into|to)\s+'), "Enter X in Y field"),
+    (re.compile(r'fill\s+(?:the\s+)?(?:billing|shipping|pincode|email|address|details)'), "Fill form fields"),
+    (re.compile(r'fill\s+[\w\s]+\s+as\s+'), "Fill X as Y"),
+    (re.compile(r'fill\s+[\w\s]+\s+with\s+'), "Fill X with Y"),
+    # "fill all the required details", "fill required details", "fill checkout details"
+    (re.compile(r'fill\s+(?:all\s+)?(?:the\s+)?(?:required\s+)?details'), "Fill required details"),
+    (re.compile(r'fill\s+.*\bdetails\b'), "Fill details (generic)"),
+    (re.compile(r'checkout\s+.*\bfill\b|\bfill\b.*\bcheckout\b'), "Checkout with fill"),
+]
+_VAGUE_FILL_RE = re.compile(r'fill\s+(?:billing|shipping|details)')
+
+# Field extraction from test case content
+_CUCUMBER_RE = re.compile(r'(?:Given|When|And|Then)\s+I\s+enter\s+"([^"]+)"\s+in\s+the\s+"?([^"\n]+)"?\s+field', re.IGNORECASE)
+_SELENIUM_RE = re.compile(r'findElement\(By\.(?:id|name|xpath|css)\("([^"]+)"\)\)', re.IGNORECASE)
+_MANUAL_RE = re.compile(
+    r'(?:enter|input|type|fill)\s+["\']?([^"\']+)["\']?\s+(?:in|into|to|for)\s+(?:the\s+)?["\']?([^"\']+)["\']?\s+field',
+    re.IGNORECASE,
+)
+_ENTER_AS_RE = re.compile(r'(?i)(?:enter|input|type)\s+([a-z0-9_\s]+?)\s+as\s+([^\n"]+?)(?=\s+in\s+the|\s*,\s*|\s*$|\n|$)')
+_FILL_RE = re.compile(r'(?i)fill\s+(?:the\s+)?([a-z0-9_\s]+?)\s+(?:as|with)\s+([^\n"]+?)(?=\s+in\s+|\s*,\s*|\s*$|\n|$)')
+_CHECKOUT_FILL_RE = re.compile(r'(?:fill\s+.*\bdetails\b|checkout\s+.*\bfill\b|\bfill\b.*\bcheckout\b)', re.IGNORECASE)
+
+# (keywords that must all appear in the field name, type), first match wins
+_FIELD_TYPE_RULES = [
+    (("email",), "email"),
+    (("phone",), "phone"),
+    (("mobile",), "phone"),
+    (("password",), "password"),
+    (("address",), "address"),
+    (("street",), "address"),
+    (("name", "user"), "name"),
+    (("first_name",), "first_name"),
+    (("firstname",), "first_name"),
+    (("last_name",), "last_name"),
+    (("lastname",), "last_name"),
+    (("date",), "date"),
+    (("dob",), "date"),
+    (("birth",), "date"),
+    (("time",), "datetime"),
+    (("age",), "integer"),
+    (("quantity",), "integer"),
+    (("count",), "integer"),
+    (("price",), "decimal"),
+    (("amount",), "decimal"),
+    (("salary",), "decimal"),
+    (("url",), "url"),
+    (("link",), "url"),
+    (("zip",), "zipcode"),
+    (("postal",), "zipcode"),
+    (("pincode",), "zipcode"),
+    (("pin_code",), "zipcode"),
+    (("city",), "city"),
+    (("state",), "state"),
+    (("country",), "country"),
+    (("card", "number"), "credit_card"),
+    (("ssn",), "ssn"),
+    (("social_security",), "ssn"),
+]
+
+
+@lru_cache(maxsize=4096)
+def _field_type_from_name(name: str) -> Optional[str]:
+    """Type implied by a lowercased field name; cached since the same names recur across test cases."""
+    for keywords, field_type in _FIELD_TYPE_RULES:
+        if all(k in name for k in keywords):
+            return field_type
+    return None
+
+
+# Sample-value shapes for _infer_field_type
+_PHONE_RE = re.compile(r'^\d{3}-\d{3}-\d{4}$')
+_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+_arrow_pools: Dict[str, pa.StringArray] = {}
+
+
+def _arrow_pool(kind: str, n: int) -> pa.StringArray:
+    """
+    The cached fake.<kind>() pool (at least min(n, pool size) values) as an Arrow array.
+    Converted again only when the underlying pool has grown; addresses are joined onto
+    one line here, once per pool rather than per row.
+    """
+    values = _faker_values(kind, n)
+    pool = _arrow_pools.get(kind)
+    if pool is None or len(pool) != len(values):
+        if kind == "address":
+            values = [a.replace("\n", ", ") for a in values]
+        pool = pa.array(values, type=pa.string())
+        _arrow_pools[kind] = pool
+    return pool
+
+
+def _constant_value(n: int) -> list:
+    """Fallback column: "value" in every row."""
+    return ["value"] * n
+
+
+def _iso_strings(stamps: np.ndarray) -> pa.Array:
+    """ISO-8601 strings for a datetime64[D] or datetime64[s] array, formatted by one Arrow cast."""
+    strings = pa.array(stamps).cast(pa.string())
+    if stamps.dtype == np.dtype("datetime64[D]"):
+        return strings
+    # the cast writes "YYYY-MM-DD HH:MM:SS"
+    return pc.replace_substring(strings, " ", "T", max_replacements=1)
+
 
 class SyntheticDataGenerator:
     """Enhanced synthetic data generator with crawler and dynamic scenarios."""
     
     def __init__(self):
         self.fake = fake
+        self.rng = np.random.default_rng()
         
     def generate_from_schema_version(
         self,
@@ -37,6 +156,7 @@ class SyntheticDataGenerator:
     ) -> Dict:
         """Generate synthetic data from existing schema version (original method)."""
         db = SessionLocal()
+        logs = None
         try:
             if not job_id:
                 job = Job(operation="synthetic", status="running", request_json={"schema_version_id": schema_version_id})
@@ -47,12 +167,18 @@ class SyntheticDataGenerator:
             else:
                 job = db.query(Job).get(job_id)
 
-            def log(msg: str, level: str = "info"):
-                db.add(JobLog(job_id=job_id, level=level, message=msg))
-                db.commit()
+            logs = JobLogBuffer(db, job_id)
+            log = logs.log
 
             log("Starting synthetic generation from schema version")
-            sv = db.query(SchemaVersion).filter(SchemaVersion.id == schema_version_id).first()
+            logs.flush()
+            # Tables and their columns in two SELECT ... IN queries instead of one query per table
+            sv = (
+                db.query(SchemaVersion)
+                .options(selectinload(SchemaVersion.tables_rel).selectinload(TableMeta.columns))
+                .filter(SchemaVersion.id == schema_version_id)
+                .first()
+            )
             if not sv:
                 log("Schema version not found", "error")
                 job.status = "failed"
@@ -75,20 +201,20 @@ class SyntheticDataGenerator:
                 data = {}
                 for cname, dtype, inferred in cols:
                     try:
-                        data[cname] = [self._generate_value(cname, str(dtype or ""), str(inferred or "")) for _ in range(n)]
+                        data[cname] = _fake_column(cname, str(dtype or ""), str(inferred or ""), n)
                     except Exception as e:
                         logger.warning("Column %s: %s", cname, e)
                         data[cname] = ["value"] * n
                         
-                df = pd.DataFrame(data)
-                df.to_parquet(out_path / f"{table.name}.parquet", index=False)
+                # Columns are already arrays: straight to Arrow, no DataFrame in between
+                pq.write_table(pa.table(data), out_path / f"{table.name}.parquet", **parquet_write_options())
                 generated[table.name] = n
                 log(f"Generated {table.name}: {n} rows")
 
             # Save metadata
             self._save_dataset_metadata(db, version_id, schema_version_id, generated, job_id, job, "schema_version")
             log("Synthetic generation completed")
-            db.commit()
+            logs.flush()
             return {"job_id": job_id, "dataset_version_id": version_id}
             
         except Exception as e:
@@ -100,8 +226,7 @@ class SyntheticDataGenerator:
                     if job:
                         job.status = "failed"
                         job.result_json = {"error": str(e)}
-                        db.add(JobLog(job_id=job_id, level="error", message=str(e)))
-                        db.commit()
+                        (logs or JobLogBuffer(db, job_id)).log(str(e), "error")
                 except Exception:
                     pass
             raise
@@ -118,6 +243,7 @@ class SyntheticDataGenerator:
     ) -> Dict:
         """Generate synthetic data by crawling test case URLs."""
         db = SessionLocal()
+        logs = None
         try:
             if not job_id:
                 job = Job(
@@ -136,11 +262,11 @@ class SyntheticDataGenerator:
             else:
                 job = db.query(Job).get(job_id)
 
-            def log(msg: str, level: str = "info"):
-                db.add(JobLog(job_id=job_id, level=level, message=msg))
-                db.commit()
+            logs = JobLogBuffer(db, job_id)
+            log = logs.log
 
             log(f"Starting synthetic generation from test cases: {test_case_urls}")
+            logs.flush()
             
             # Crawl test cases
             with TestCaseCrawler() as crawler:
@@ -162,24 +288,7 @@ class SyntheticDataGenerator:
             out_path = Path(settings.dataset_store_path) / version_id
             generated = {}
             
-            for entity_name, entity_info in schema.get("entities", {}).items():
-                n = row_counts.get(entity_name, default_rows)
-                fields = entity_info.get("fields", {})
-                
-                if not fields:
-                    continue
-                    
-                data = {}
-                for field_name, field_info in fields.items():
-                    field_type = field_info.get("type", "string")
-                    try:
-                        data[field_name] = [self._generate_value_by_type(field_name, field_type) for _ in range(n)]
-                    except Exception as e:
-                        logger.warning(f"Field {field_name}: {e}")
-                        data[field_name] = ["value"] * n
-                        
-                df = pd.DataFrame(data)
-                df.to_parquet(out_path / f"{entity_name}.parquet", index=False)
+            for entity_name, n in self._generate_entities(schema.get("entities", {}), row_counts, default_rows, out_path):
                 generated[entity_name] = n
                 log(f"Generated {entity_name}: {n} rows")
                 
@@ -199,7 +308,7 @@ class SyntheticDataGenerator:
             )
             
             log("Synthetic generation from test cases completed")
-            db.commit()
+            logs.flush()
             return {"job_id": job_id, "dataset_version_id": version_id, "entities": list(schema.get("entities", {}).keys())}
             
         except Exception as e:
@@ -211,8 +320,7 @@ class SyntheticDataGenerator:
                     if job:
                         job.status = "failed"
                         job.result_json = {"error": str(e)}
-                        db.add(JobLog(job_id=job_id, level="error", message=str(e)))
-                        db.commit()
+                        (logs or JobLogBuffer(db, job_id)).log(str(e), "error")
                 except Exception:
                     pass
             raise
@@ -228,6 +336,7 @@ class SyntheticDataGenerator:
         """Generate synthetic data from raw test case content (Cucumber, Selenium, manual steps)."""
         logger.info("Generating from test case content...")
         db = SessionLocal()
+        logs = None
         try:
             if not job_id:
                 job = Job(
@@ -242,12 +351,14 @@ class SyntheticDataGenerator:
             else:
                 job = db.query(Job).get(job_id)
 
+            logs = JobLogBuffer(db, job_id)
+
             def log(msg: str, level: str = "info"):
-                db.add(JobLog(job_id=job_id, level=level, message=msg))
-                db.commit()
+                logs.log(msg, level)
                 logger.info(f"   {msg}")
 
             log("Starting synthetic generation from test case content")
+            logs.flush()
             logger.info(f"   Content length: {len(test_case_content)} characters")
 
             # Check if test case needs synthetic data (has form fields)
@@ -257,7 +368,7 @@ class SyntheticDataGenerator:
                 logger.info(f"   {reason}")
                 job.status = "completed"
                 job.result_json = {"skipped": True, "reason": reason, "dataset_version_id": None}
-                db.commit()
+                logs.flush()
                 return None
 
             # Parse test case content to extract fields
@@ -266,7 +377,7 @@ class SyntheticDataGenerator:
                 log("No form fields parsed - skipping synthetic generation", "info")
                 job.status = "completed"
                 job.result_json = {"skipped": True, "reason": "No form fields in test case", "dataset_version_id": None}
-                db.commit()
+                logs.flush()
                 return None
 
             entities_count = len(schema.get('entities', {}))
@@ -285,24 +396,7 @@ class SyntheticDataGenerator:
             out_path = Path(settings.dataset_store_path) / version_id
             generated = {}
             
-            for entity_name, entity_info in schema.get("entities", {}).items():
-                n = row_counts.get(entity_name, default_rows)
-                fields = entity_info.get("fields", {})
-                
-                if not fields:
-                    continue
-                    
-                data = {}
-                for field_name, field_info in fields.items():
-                    field_type = field_info.get("type", "string")
-                    try:
-                        data[field_name] = [self._generate_value_by_type(field_name, field_type) for _ in range(n)]
-                    except Exception as e:
-                        logger.warning(f"Field {field_name}: {e}")
-                        data[field_name] = ["value"] * n
-                        
-                df = pd.DataFrame(data)
-                df.to_parquet(out_path / f"{entity_name}.parquet", index=False)
+            for entity_name, n in self._generate_entities(schema.get("entities", {}), row_counts, default_rows, out_path):
                 generated[entity_name] = n
                 log(f"Generated {entity_name}: {n} rows")
                 
@@ -321,7 +415,7 @@ class SyntheticDataGenerator:
             log("Synthetic generation from test case content completed")
             job.status = "completed"
             job.result_json = {"dataset_version_id": version_id, "entities": list(schema.get("entities", {}).keys())}
-            db.commit()
+            logs.flush()
             return version_id
             
         except Exception as e:
@@ -333,8 +427,7 @@ class SyntheticDataGenerator:
                     if job:
                         job.status = "failed"
                         job.result_json = {"error": str(e)}
-                        db.add(JobLog(job_id=job_id, level="error", message=str(e)))
-                        db.commit()
+                        (logs or JobLogBuffer(db, job_id)).log(str(e), "error")
                 except Exception:
                     pass
             raise
@@ -350,6 +443,7 @@ class SyntheticDataGenerator:
     ) -> Dict:
         """Generate synthetic data from predefined domain scenarios."""
         db = SessionLocal()
+        logs = None
         try:
             if not job_id:
                 job = Job(
@@ -364,11 +458,11 @@ class SyntheticDataGenerator:
             else:
                 job = db.query(Job).get(job_id)
 
-            def log(msg: str, level: str = "info"):
-                db.add(JobLog(job_id=job_id, level=level, message=msg))
-                db.commit()
+            logs = JobLogBuffer(db, job_id)
+            log = logs.log
 
             log(f"Starting synthetic generation for domain: {domain}, scenario: {scenario}")
+            logs.flush()
             
             # Get schema from domain/scenario
             schema = self._get_domain_schema(domain, scenario)
@@ -383,24 +477,7 @@ class SyntheticDataGenerator:
             out_path = Path(settings.dataset_store_path) / version_id
             generated = {}
             
-            for entity_name, entity_info in schema.get("entities", {}).items():
-                n = row_counts.get(entity_name, default_rows)
-                fields = entity_info.get("fields", {})
-                
-                if not fields:
-                    continue
-                    
-                data = {}
-                for field_name, field_info in fields.items():
-                    field_type = field_info.get("type", "string")
-                    try:
-                        data[field_name] = [self._generate_value_by_type(field_name, field_type) for _ in range(n)]
-                    except Exception as e:
-                        logger.warning(f"Field {field_name}: {e}")
-                        data[field_name] = ["value"] * n
-                        
-                df = pd.DataFrame(data)
-                df.to_parquet(out_path / f"{entity_name}.parquet", index=False)
+            for entity_name, n in self._generate_entities(schema.get("entities", {}), row_counts, default_rows, out_path):
                 generated[entity_name] = n
                 log(f"Generated {entity_name}: {n} rows")
                 
@@ -418,7 +495,7 @@ class SyntheticDataGenerator:
             )
             
             log("Synthetic generation from domain scenario completed")
-            db.commit()
+            logs.flush()
             return {"job_id": job_id, "dataset_version_id": version_id}
             
         except Exception as e:
@@ -430,14 +507,73 @@ class SyntheticDataGenerator:
                     if job:
                         job.status = "failed"
                         job.result_json = {"error": str(e)}
-                        db.add(JobLog(job_id=job_id, level="error", message=str(e)))
-                        db.commit()
+                        (logs or JobLogBuffer(db, job_id)).log(str(e), "error")
                 except Exception:
                     pass
             raise
         finally:
             db.close()
     
+    def _generate_entities(self, entities: Dict, row_counts: Dict[str, int], default_rows: int, out_path: Path) -> List[tuple]:
+        """Write one parquet file per entity with fields; returns (entity, rows) in schema order."""
+        tasks = [
+            (name, info.get("fields", {}), row_counts.get(name, default_rows), out_path / f"{name}.parquet")
+            for name, info in entities.items()
+            if info.get("fields")
+        ]
+        workers = process_pool_workers([n for _, _, n, _ in tasks])
+        if workers:
+            # Large jobs: entities are independent and generation is CPU-bound, so use processes, not threads.
+            with spawn_executor(workers) as ex:
+                return list(ex.map(_generate_one_entity, tasks))
+        return [self._write_entity(*task) for task in tasks]
+
+    def _write_entity(self, entity_name: str, fields: Dict, n: int, fp: Path) -> tuple:
+        """
+        Generate n rows for one entity's fields and write them to fp.
+        Rows are generated and written one row group at a time through a ParquetWriter,
+        so memory is bounded by the row group size rather than n; writing overlaps generation.
+        """
+        options = parquet_write_options()
+        row_group_size = options.pop("row_group_size")
+        generators = {}
+        for field_name, field_info in fields.items():
+            generate = self._compile_generator(field_name, field_info.get("type", "string"))
+            try:
+                # Probe once: a field that fails is filled with "value" in every row group,
+                # so the column type cannot change between row groups
+                generate(1)
+            except Exception as e:
+                logger.warning(f"Field {field_name}: {e}")
+                generate = _constant_value
+            generators[field_name] = generate
+        writer = None
+        pending = None
+        # Row group k is encoded and written (GIL released in Arrow) while row group k+1 is generated;
+        # at most one write is in flight, so memory stays at two row groups.
+        with ThreadPoolExecutor(max_workers=1) as io:
+            try:
+                # max(n, 1): an entity with no rows still gets a file with its schema
+                for start in range(0, max(n, 1), row_group_size):
+                    table = self._entity_chunk(generators, min(row_group_size, n - start))
+                    if writer is None:
+                        writer = pq.ParquetWriter(fp, table.schema, **options)
+                    if pending is not None:
+                        pending.result()
+                    pending = io.submit(writer.write_table, table)
+                if pending is not None:
+                    pending.result()
+            finally:
+                if pending is not None:
+                    wait([pending])  # never close the file under an in-flight write
+                if writer is not None:
+                    writer.close()
+        return entity_name, n
+
+    def _entity_chunk(self, generators: Dict[str, Callable[[int], Any]], n: int) -> pa.Table:
+        """n rows from the per-field generators of _compile_generator, as an Arrow table."""
+        return pa.table({field_name: generate(n) for field_name, generate in generators.items()})
+
     def test_case_needs_synthetic_data(self, content: str) -> tuple[bool, str]:
         """
         Detect if test case content indicates form fields that need synthetic data.
@@ -446,51 +582,28 @@ class SyntheticDataGenerator:
         if not content or not content.strip():
             return False, "Empty test case"
         content_lower = content.lower()
-        # Patterns that indicate form/data entry
-        patterns = [
-            (r'(?:enter|input|type|fill)\s+\w+\s+as\s+', "Enter X as Y"),
-            (r'(?:enter|input|type|fill)\s+[\w\s]+\s+(?:in|into|to)\s+', "Enter X in Y field"),
-            (r'fill\s+(?:the\s+)?(?:billing|shipping|pincode|email|address|details)', "Fill form fields"),
-            (r'fill\s+[\w\s]+\s+as\s+', "Fill X as Y"),
-            (r'fill\s+[\w\s]+\s+with\s+', "Fill X with Y"),
-            # "fill all the required details", "fill required details", "fill checkout details"
-            (r'fill\s+(?:all\s+)?(?:the\s+)?(?:required\s+)?details', "Fill required details"),
-            (r'fill\s+.*\bdetails\b', "Fill details (generic)"),
-            (r'checkout\s+.*\bfill\b|\bfill\b.*\bcheckout\b', "Checkout with fill"),
-        ]
-        for pat, desc in patterns:
-            if re.search(pat, content_lower):
+        for pat, desc in _FORM_ENTRY_PATTERNS:
+            if pat.search(content_lower):
                 return True, desc
         # Vague "fill details" - assume needs data
-        if re.search(r'fill\s+(?:billing|shipping|details)', content_lower):
+        if _VAGUE_FILL_RE.search(content_lower):
             return True, "Fill form details"
         return False, "No form field patterns detected (navigation/click-only test)"
 
     def _parse_test_case_content(self, content: str) -> Dict[str, Any]:
         """Parse test case content to extract entity and field information."""
-        import re
-
         entities = {}
 
-        # Parse Cucumber-style "Given/When/Then" steps
-        cucumber_pattern = r'(?:Given|When|And|Then)\s+I\s+enter\s+"([^"]+)"\s+in\s+the\s+"?([^"\n]+)"?\s+field'
-        matches = re.findall(cucumber_pattern, content, re.IGNORECASE)
-
-        # Parse Selenium-style findElement calls
-        selenium_pattern = r'findElement\(By\.(?:id|name|xpath|css)\("([^"]+)"\)\)'
-        selenium_matches = re.findall(selenium_pattern, content, re.IGNORECASE)
-
-        # Parse manual test step patterns like "Enter X in Y field"
-        manual_pattern = r'(?:enter|input|type|fill)\s+["\']?([^"\']+)["\']?\s+(?:in|into|to|for)\s+(?:the\s+)?["\']?([^"\']+)["\']?\s+field'
-        manual_matches = re.findall(manual_pattern, content, re.IGNORECASE)
-
-        # Parse "Enter <field> as <value>" (e.g. "Enter pincode as 500032", "Enter email as test@gmail.com")
-        enter_as_pattern = r'(?i)(?:enter|input|type)\s+([a-z0-9_\s]+?)\s+as\s+([^\n"]+?)(?=\s+in\s+the|\s*,\s*|\s*$|\n|$)'
-        enter_as_matches = re.findall(enter_as_pattern, content)
-
-        # Parse "fill X as Y" / "fill X with Y"
-        fill_pattern = r'(?i)fill\s+(?:the\s+)?([a-z0-9_\s]+?)\s+(?:as|with)\s+([^\n"]+?)(?=\s+in\s+|\s*,\s*|\s*$|\n|$)'
-        fill_matches = re.findall(fill_pattern, content)
+        # Cucumber-style "Given/When/Then" steps
+        matches = _CUCUMBER_RE.findall(content)
+        # Selenium-style findElement calls
+        selenium_matches = _SELENIUM_RE.findall(content)
+        # Manual test step patterns like "Enter X in Y field"
+        manual_matches = _MANUAL_RE.findall(content)
+        # "Enter <field> as <value>" (e.g. "Enter pincode as 500032", "Enter email as test@gmail.com")
+        enter_as_matches = _ENTER_AS_RE.findall(content)
+        # "fill X as Y" / "fill X with Y"
+        fill_matches = _FILL_RE.findall(content)
         
         # Combine all matches
         all_fields = []
@@ -542,7 +655,7 @@ class SyntheticDataGenerator:
         
         # Fallback: "fill details" / "fill required details" / "checkout" without specific fields
         # Use common checkout form fields
-        if not entities and re.search(r'(?:fill\s+.*\bdetails\b|checkout\s+.*\bfill\b|\bfill\b.*\bcheckout\b)', content, re.IGNORECASE):
+        if not entities and _CHECKOUT_FILL_RE.search(content):
             logger.info("Detected fill/checkout pattern - using default checkout form fields")
             entities["checkout"] = {
                 "fields": {
@@ -566,122 +679,73 @@ class SyntheticDataGenerator:
     
     def _infer_field_type(self, field_name: str, sample_value: Optional[str] = None) -> str:
         """Infer field type from field name and optional sample value."""
-        field_name_lower = field_name.lower()
-        
-        # Check field name patterns
-        if "email" in field_name_lower:
-            return "email"
-        elif "phone" in field_name_lower or "mobile" in field_name_lower:
-            return "phone"
-        elif "password" in field_name_lower:
-            return "password"
-        elif "address" in field_name_lower or "street" in field_name_lower:
-            return "address"
-        elif "name" in field_name_lower and "user" in field_name_lower:
-            return "name"
-        elif "first_name" in field_name_lower or "firstname" in field_name_lower:
-            return "first_name"
-        elif "last_name" in field_name_lower or "lastname" in field_name_lower:
-            return "last_name"
-        elif "date" in field_name_lower or "dob" in field_name_lower or "birth" in field_name_lower:
-            return "date"
-        elif "time" in field_name_lower or "timestamp" in field_name_lower:
-            return "datetime"
-        elif "age" in field_name_lower or "quantity" in field_name_lower or "count" in field_name_lower:
-            return "integer"
-        elif "price" in field_name_lower or "amount" in field_name_lower or "salary" in field_name_lower:
-            return "decimal"
-        elif "url" in field_name_lower or "link" in field_name_lower:
-            return "url"
-        elif "zip" in field_name_lower or "postal" in field_name_lower or "pincode" in field_name_lower or "pin_code" in field_name_lower:
-            return "zipcode"
-        elif "city" in field_name_lower:
-            return "city"
-        elif "state" in field_name_lower:
-            return "state"
-        elif "country" in field_name_lower:
-            return "country"
-        elif "card" in field_name_lower and "number" in field_name_lower:
-            return "credit_card"
-        elif "ssn" in field_name_lower or "social_security" in field_name_lower:
-            return "ssn"
-        
+        field_type = _field_type_from_name(field_name.lower())
+        if field_type:
+            return field_type
+
         # Check sample value if provided
         if sample_value:
             if "@" in sample_value:
                 return "email"
-            elif re.match(r'^\d{3}-\d{3}-\d{4}$', sample_value):
+            elif _PHONE_RE.match(sample_value):
                 return "phone"
-            elif re.match(r'^\d{4}-\d{2}-\d{2}$', sample_value):
+            elif _DATE_RE.match(sample_value):
                 return "date"
         
         # Default to string
         return "string"
             
-    def _generate_value(self, col_name: str, data_type: str, inferred: str):
-        """Original value generator (for backward compatibility)."""
-        if inferred:
-            inferred = inferred.lower()
-            if "email" in inferred or col_name.lower() == "email":
-                return self.fake.email() if self.fake else "user@example.com"
-            if "phone" in inferred or "phone" in col_name.lower():
-                return self.fake.phone_number() if self.fake else "+1555000000"
-            if "name" in inferred or "name" in col_name.lower():
-                return self.fake.name() if self.fake else "Unknown"
-            if "address" in inferred or "address" in col_name.lower():
-                return self.fake.address() if self.fake else "123 Main St"
-            if "date" in inferred or "date" in col_name.lower():
-                return self.fake.date_isoformat() if self.fake else "2024-01-01"
-                
-        if data_type:
-            dt = str(data_type).upper()
-            if "UUID" in dt:
-                return str(uuid4())
-            if "INT" in dt or "SERIAL" in dt or "BIGINT" in dt:
-                return self.fake.random_int(1, 1000000) if self.fake else 1
-            if "BOOL" in dt:
-                return self.fake.boolean() if self.fake else False
-            if "DATE" in dt or "TIME" in dt:
-                return self.fake.iso8601() if self.fake else "2024-01-01T00:00:00"
-            if "CHAR" in dt or "TEXT" in dt or "VARCHAR" in dt:
-                return self.fake.word() if self.fake else "value"
-                
-        return self.fake.word() if self.fake else "value"
-        
-    def _generate_value_by_type(self, field_name: str, field_type: str):
-        """Generate value based on semantic type."""
+    def _bulk_faker(self, kind: str, n: int) -> pa.Array:
+        """
+        n fake.<kind>() values sampled from a pool built once per process (shared with services.synthetic).
+        Sampling is an Arrow take on the pool, so no Python string objects are created per row.
+        """
+        if n == 0:
+            return pa.array([], type=pa.string())
+        pool = _arrow_pool(kind, n)
+        return pool.take(self.rng.integers(0, len(pool), size=n))
+
+    def _compile_generator(self, field_name: str, field_type: str) -> Callable[[int], Any]:
+        """
+        Resolve the semantic-type branch for one field once.
+        The returned function takes n and generates the whole column, so the branch chain
+        runs once per field rather than once per chunk or row.
+        """
         if not self.fake:
-            return "value"
-            
+            return _constant_value
+
         field_type = field_type.lower()
         field_name_lower = field_name.lower()
-        
+        rng = self.rng
+
         if field_type == "email" or "email" in field_name_lower:
-            return self.fake.email()
+            return partial(self._bulk_faker, "email")
         elif field_type == "phone" or "phone" in field_name_lower:
-            return self.fake.phone_number()
+            return partial(self._bulk_faker, "phone_number")
         elif field_type == "person_name" or "name" in field_name_lower:
-            return self.fake.name()
+            return partial(self._bulk_faker, "name")
         elif field_type == "address" or "address" in field_name_lower:
-            return self.fake.address().replace('\n', ', ')
+            return partial(self._bulk_faker, "address")
         elif field_type == "date" or "date" in field_name_lower:
-            return self.fake.date_between(start_date='-2y', end_date='today').isoformat()
+            # day offsets over the last two years, today included
+            return lambda n: _iso_strings(np.datetime64(datetime.utcnow().date(), "D") - rng.integers(0, 731, size=n))
         elif field_type == "datetime":
-            return self.fake.date_time_between(start_date='-2y', end_date='now').isoformat()
+            return lambda n: _iso_strings(np.datetime64(datetime.utcnow(), "s") - rng.integers(0, 730 * 86400 + 1, size=n))
         elif field_type == "integer" or field_type == "number":
             if "price" in field_name_lower or "amount" in field_name_lower:
-                return round(random.uniform(10, 1000), 2)
+                return lambda n: np.round(rng.uniform(10, 1000, size=n), 2)
             elif "id" in field_name_lower:
-                return random.randint(1, 100000)
+                return lambda n: rng.integers(1, 100001, size=n)
             else:
-                return random.randint(1, 1000)
+                return lambda n: rng.integers(1, 1001, size=n)
         elif field_type == "boolean":
-            return random.choice([True, False])
+            # sampled straight into a bool array, no int64 intermediate
+            return lambda n: rng.integers(0, 2, size=n, dtype=np.bool_)
         elif field_type == "password":
-            return self.fake.password()
+            return partial(self._bulk_faker, "password")
         else:
-            return self.fake.word()
-            
+            return partial(self._bulk_faker, "word")
+
     def _get_domain_schema(self, domain: str, scenario: str) -> Dict:
         """Get predefined schema for a domain and scenario."""
         # Use crawler's fallback schema which has domain templates
@@ -747,6 +811,11 @@ class SyntheticDataGenerator:
         job.finished_at = datetime.utcnow()
         
 
+def _generate_one_entity(task: tuple) -> tuple:
+    """Worker entry point: each process has its own generator (Faker pools and RNG)."""
+    return SyntheticDataGenerator()._write_entity(*task)
+
+
 # Backward compatibility function
 def run_synthetic(
     schema_version_id: str,
@@ -6,23 +6,53 @@ Phase 3: Hybrid Synthetic Engine — Multi-source generator.
 4. Optional SDV (falls back to Faker if unavailable)
 """
 import logging
+import operator
 import random
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dataset_store import parquet_write_options
+from services.process_pool import process_pool_workers, spawn_executor
 from services.synthetic_enhanced import SyntheticDataGenerator
 
 logger = logging.getLogger("tdm.synthetic_hybrid")
 
-# Rule-based constraints: (condition_col, condition_val) -> (target_col, target_val)
+# Rule-based constraints: (condition_col, condition_val) -> (target_col, target_val).
+# condition_val is a value matched case-insensitively, or an (operator, threshold) comparison.
 RULE_CONSTRAINTS = {
     ("country", "IN"): [("currency", "INR"), ("pincode_format", "6digit")],
     ("country", "US"): [("currency", "USD"), ("pincode_format", "zip5")],
     ("country", "UK"): [("currency", "GBP"), ("pincode_format", "postcode")],
-    ("age", lambda x: x < 18): [("account_status", "minor")],
-    ("age", lambda x: x >= 65): [("account_status", "senior")],
+    ("age", ("<", 18)): [("account_status", "minor")],
+    ("age", (">=", 65)): [("account_status", "senior")],
 }
 
+_RULE_OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "==": operator.eq, "!=": operator.ne}
+
+
+def _compile_rules(rules: Dict) -> List[tuple]:
+    """
+    (condition_col, upper_value, predicate, targets) per rule, in rule order; built once at import.
+    Equality rules carry the upper-cased value (predicate None); comparisons carry a Series -> mask function.
+    """
+    compiled = []
+    for (cond_col, cond_val), targets in rules.items():
+        if isinstance(cond_val, tuple):
+            op, threshold = cond_val
+            compiled.append((cond_col, None, lambda s, op=_RULE_OPERATORS[op], t=threshold: op(s, t), targets))
+        elif callable(cond_val):
+            compiled.append((cond_col, None, cond_val, targets))
+        else:
+            compiled.append((cond_col, str(cond_val).upper(), None, targets))
+    return compiled
+
+
+_COMPILED_RULES = _compile_rules(RULE_CONSTRAINTS)
+
 # Test case flow templates
 FLOW_TEMPLATES = {
     "ecommerce_checkout": ["login", "add_to_cart", "checkout", "payment"],
@@ -31,25 +61,90 @@ FLOW_TEMPLATES = {
 }
 
 
-def apply_rule_constraints(row: Dict[str, Any], table_name: str) -> Dict[str, Any]:
-    """Apply rule-based constraints to a row."""
-    for (cond_col, cond_val), targets in RULE_CONSTRAINTS.items():
-        if cond_col not in row:
+def apply_rule_constraints(df: pd.DataFrame, table_name: str) -> pd.DataFrame:
+    """
+    Apply rule-based constraints to all rows at once: one boolean mask per rule,
+    in RULE_CONSTRAINTS order. A target is only filled where it is still missing,
+    so an earlier rule wins over a later one.
+    """
+    # Upper-cased condition columns, shared by all equality rules on the same column
+    upper = {}
+    for cond_col, upper_val, predicate, targets in _COMPILED_RULES:
+        if cond_col not in df.columns:
             continue
-        val = row[cond_col]
-        match = False
-        if callable(cond_val):
+        if predicate is None:
+            if cond_col not in upper:
+                upper[cond_col] = df[cond_col].astype(str).str.upper()
+            mask = upper[cond_col] == upper_val
+        else:
             try:
-                match = cond_val(val)
+                mask = pd.Series(predicate(df[cond_col]), index=df.index).fillna(False).astype(bool)
             except Exception:
-                pass
-        else:
-            match = str(val).upper() == str(cond_val).upper()
-        if match:
-            for tcol, tval in targets:
-                if tcol not in row or row[tcol] is None:
-                    row[tcol] = tval
-    return row
+                continue
+        if not mask.any():
+            continue
+        for tcol, tval in targets:
+            if tcol not in df.columns:
+                df[tcol] = None
+            fill = mask & df[tcol].isna()
+            if fill.any():
+                if df[tcol].dtype != object and not pd.api.types.is_string_dtype(df[tcol]):
+                    df[tcol] = df[tcol].astype(object)
+                df.loc[fill, tcol] = tval
+                upper.pop(tcol, None)
+    return df
+
+
+def _write_rules_entity(generator: SyntheticDataGenerator, entity_name: str, fields: Dict, n: int, fp: Path) -> tuple:
+    """
+    Generate one entity, apply the rule constraints and write it to fp. Returns (entity, rows).
+    Rows are generated, constrained and written one row group at a time through a ParquetWriter,
+    so memory is bounded by the row group size rather than n. Rules only look at their own row,
+    so applying them per row group gives the same result as applying them to the whole entity.
+    """
+    options = parquet_write_options()
+    row_group_size = options.pop("row_group_size")
+    # One vectorized generator per field (NumPy arrays / Arrow string arrays), resolved once
+    generators = {
+        field_name: generator._compile_generator(field_name, field_info.get("type", "string"))
+        for field_name, field_info in fields.items()
+    }
+    # Every row group gets the same columns: rule targets exist even where no rule fired
+    rule_targets = list(dict.fromkeys(
+        tcol
+        for cond_col, _, _, targets in _COMPILED_RULES
+        if cond_col in fields
+        for tcol, _ in targets
+        if tcol not in fields
+    ))
+    writer = None
+    try:
+        # max(n, 1): an entity with no rows still gets a file with its schema
+        for start in range(0, max(n, 1), row_group_size):
+            k = min(row_group_size, n - start)
+            df = pa.table({field_name: generate(k) for field_name, generate in generators.items()}).to_pandas()
+            for tcol in rule_targets:
+                df[tcol] = None
+            # Rules are applied column-wise on the frame, not row by row
+            table = pa.Table.from_pandas(apply_rule_constraints(df, entity_name), preserve_index=False)
+            if writer is None:
+                # A target no rule filled in the first row group is all-null; it holds strings
+                schema = pa.schema([f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in table.schema])
+                writer = pq.ParquetWriter(fp, schema, **options)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    return entity_name, n
+
+
+def _rules_entity_worker(task: tuple) -> tuple:
+    """
+    Process-pool entry point. task is (generator class, *_write_rules_entity args); each worker
+    builds a fresh instance of the caller's generator class with its own Faker pools and RNG stream.
+    """
+    generator_cls, *args = task
+    return _write_rules_entity(generator_cls(), *args)
 
 
 def generate_with_rules(
@@ -59,30 +154,26 @@ def generate_with_rules(
     out_path: Path,
     job_id: Optional[str] = None,
 ) -> Dict[str, int]:
-    """Generate data with rule-based constraints applied."""
-    generated = {}
+    """
+    Generate data with rule-based constraints applied.
+    Jobs of at least PROCESS_POOL_MIN_ROWS total rows are split across worker processes, each using a
+    new instance of type(base_generator) (its RNG state cannot be shared); smaller jobs use base_generator itself.
+    """
     default_rows = row_counts.get("*", 1000)
-    for entity_name, entity_info in schema.get("entities", {}).items():
-        n = row_counts.get(entity_name, default_rows)
-        fields = entity_info.get("fields", {})
-        if not fields:
-            continue
-        data = {}
-        for field_name, field_info in fields.items():
-            ft = field_info.get("type", "string")
-            data[field_name] = [
-                base_generator._generate_value_by_type(field_name, ft) for _ in range(n)
-            ]
-        # Build rows and apply rules
-        rows = [dict(zip(data.keys(), vals)) for vals in zip(*data.values())]
-        for row in rows:
-            apply_rule_constraints(row, entity_name)
-        # Convert back to columns
-        import pandas as pd
-        df = pd.DataFrame(rows)
-        df.to_parquet(out_path / f"{entity_name}.parquet", index=False)
-        generated[entity_name] = n
-    return generated
+    tasks = [
+        (entity_name, entity_info.get("fields", {}), row_counts.get(entity_name, default_rows), out_path / f"{entity_name}.parquet")
+        for entity_name, entity_info in schema.get("entities", {}).items()
+        if entity_info.get("fields")
+    ]
+    workers = process_pool_workers([n for _, _, n, _ in tasks])
+    if workers:
+        # Large jobs: entities are independent and CPU-bound, so one process each, up to the core count.
+        generator_cls = type(base_generator)
+        with spawn_executor(workers) as ex:
+            results = list(ex.map(_rules_entity_worker, [(generator_cls, *task) for task in tasks]))
+    else:
+        results = [_write_rules_entity(base_generator, *task) for task in tasks]
+    return dict(results)
 
 
 def get_flow_entities(flow_name: str) -> Dict[str, Any]:
@@ -40,6 +40,13 @@ class TestWorkflowEndpoints:
         assert "operations" in data
         assert isinstance(data["operations"], list)
 
+    def test_execute_rejects_oversized_test_case_content(self, client: TestClient):
+        r = client.post(
+            "/api/v1/workflow/execute",
+            json={"test_case_content": "x" * (1_048_576 + 1)},
+        )
+        assert r.status_code == 422
+
     def test_analyze_test_case(self, client: TestClient):
         r = client.post(
             "/api/v1/workflow/analyze-test-case",
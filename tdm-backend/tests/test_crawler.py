@@ -0,0 +1,141 @@
+"""Unit tests for the UI crawler's schema extraction helpers."""
+import pytest
+from services.crawler import SchemaCache, TestCaseCrawler
+
+
+class TestExtractFromSerializedPage:
+    """Tests for extraction from the page.evaluate payload."""
+
+    def setup_method(self):
+        self.crawler = TestCaseCrawler()
+
+    def test_form_fields_are_typed_and_filtered(self):
+        form = {
+            "name": "signup",
+            "action": "/register",
+            "fields": [
+                {"tag": "input", "type": "email", "name": "email", "required": True},
+                {"tag": "input", "type": None, "name": "first_name"},
+                {"tag": "input", "type": "hidden", "name": "csrf"},
+            ],
+        }
+        schema = self.crawler._extract_form_schema(form)
+        assert schema["name"] == "signup"
+        assert [f["name"] for f in schema["fields"]] == ["email", "first_name"]
+        assert schema["fields"][0]["inferred_type"] == "email"
+        assert schema["fields"][0]["required"] is True
+        assert schema["fields"][1]["type"] == "text"
+        assert schema["fields"][1]["inferred_type"] == "person_name"
+
+    def test_select_keeps_options(self):
+        field = self.crawler._extract_field_info(
+            {"tag": "select", "name": "country", "options": ["US", "IN"]}
+        )
+        assert field["options"] == ["US", "IN"]
+
+    def test_form_without_usable_fields_is_dropped(self):
+        assert self.crawler._extract_form_schema({"name": "f", "fields": [{"name": "submit"}]}) is None
+
+    def test_table_columns_inferred_from_sample_rows(self):
+        table = {
+            "headers": ["Order Date", "Total", ""],
+            "rows": [["2024-01-01", "10.5", "x"], ["2024-02-01", "7", "y"]],
+        }
+        schema = self.crawler._extract_table_schema(table)
+        assert schema["columns"] == [
+            {"name": "Order Date", "inferred_type": "date"},
+            {"name": "Total", "inferred_type": "number"},
+        ]
+
+    def test_table_name_is_stable_across_pages(self):
+        first = self.crawler._extract_table_schema({"headers": ["Id", "Total"], "rows": []})
+        second = self.crawler._extract_table_schema({"headers": ["Id", "Total"], "rows": [["1", "2"]]})
+        other = self.crawler._extract_table_schema({"headers": ["Id", "Name"], "rows": []})
+        assert first["name"] == second["name"]
+        assert first["name"] != other["name"]
+
+    def test_table_without_headers_is_dropped(self):
+        assert self.crawler._extract_table_schema({"headers": [], "rows": []}) is None
+
+
+class TestSchemaCache:
+    """Tests for the crawl schema cache."""
+
+    def test_key_ignores_url_order(self):
+        assert SchemaCache.make_key(["b", "a"], {"domain": "x"}) == SchemaCache.make_key(["a", "b"], {"domain": "x"})
+        assert SchemaCache.make_key(["a"], {"domain": "x"}) != SchemaCache.make_key(["a"], {"domain": "y"})
+
+    def test_key_depends_on_context_options(self):
+        from services.crawler import DESKTOP_CONTEXT_OPTIONS, MOBILE_CONTEXT_OPTIONS
+
+        keys = {SchemaCache.make_key(["a"], None, options) for options in (None, MOBILE_CONTEXT_OPTIONS, DESKTOP_CONTEXT_OPTIONS)}
+        assert len(keys) == 3
+        assert SchemaCache.make_key(["a"], None, {"viewport": {"width": 1, "height": 2}, "locale": "en"}) == SchemaCache.make_key(
+            ["a"], None, {"locale": "en", "viewport": {"height": 2, "width": 1}}
+        )
+
+    def test_roundtrip_and_ttl(self, tmp_path):
+        cache = SchemaCache(str(tmp_path / "cache.sqlite"), ttl_seconds=60)
+        key = SchemaCache.make_key(["https://example.com"], None)
+        assert cache.get(key) is None
+        cache.set(key, {"entities": {"user": {"fields": {}}}})
+        assert cache.get(key) == {"entities": {"user": {"fields": {}}}}
+        cache.ttl_seconds = -1
+        assert cache.get(key) is None
+
+
+class TestCrawlFallbacks:
+    """Tests for the crawl retry chain."""
+
+    class FakeCrawler:
+        def __init__(self, succeed_on):
+            self.succeed_on = succeed_on
+            self.calls = []
+
+        def crawl_test_cases(self, urls, scenario_hints=None, context_options=None, fallback=True):
+            self.calls.append(context_options)
+            if len(self.calls) == self.succeed_on:
+                return {"entities": {"user": {"fields": {}}}}
+            # Same contract as TestCaseCrawler: no extracted page means the domain pack or None
+            return self._fallback_schema(scenario_hints) if fallback else None
+
+        def _fallback_schema(self, hints):
+            return {"entities": {"domain": {"fields": {}}}}
+
+    def test_mobile_tier_reuses_crawler(self):
+        from services.crawler import MOBILE_CONTEXT_OPTIONS
+        from services.fallbacks import with_crawl_fallbacks
+
+        crawler = self.FakeCrawler(succeed_on=2)
+        result = with_crawl_fallbacks(["https://example.com"], crawler=crawler)
+        assert crawler.calls == [None, MOBILE_CONTEXT_OPTIONS]
+        assert result["schema"]["entities"] == {"user": {"fields": {}}}
+        assert [f["step"] for f in result["fallbacks_used"]] == ["playwright_headless", "playwright_mobile"]
+
+    def test_domain_pack_when_every_tier_is_empty(self):
+        from services.fallbacks import with_crawl_fallbacks
+
+        crawler = self.FakeCrawler(succeed_on=0)
+        result = with_crawl_fallbacks(["https://example.com"], crawler=crawler)
+        assert len(crawler.calls) == 3
+        assert [f["step"] for f in result["fallbacks_used"]] == [
+            "playwright_headless", "playwright_mobile", "playwright_desktop", "domain_pack",
+        ]
+
+    def test_crawler_reports_no_extracted_page(self, monkeypatch):
+        import asyncio
+        import services.crawler as crawler_module
+
+        async def no_browser(self):
+            pass
+
+        async def failing_page(self, url, scenario_hints=None, context_options=None):
+            raise RuntimeError("page failed")
+
+        monkeypatch.setattr(crawler_module, "get_schema_cache", lambda: None)
+        monkeypatch.setattr(TestCaseCrawler, "_start", no_browser)
+        monkeypatch.setattr(TestCaseCrawler, "_crawl_single_page", failing_page)
+        crawler = TestCaseCrawler()
+        urls = ["https://example.com"]
+        assert asyncio.run(crawler._crawl_and_cache(urls, None, fallback=False)) is None
+        assert asyncio.run(crawler._crawl_and_cache(urls, None))["entities"]
@@ -20,11 +20,31 @@ class TestClassifyIntent:
         intent = classify_intent(test_case_content="fill email as test@example.com")
         assert "synthetic" in intent["operations"]
 
+    def test_selenium_and_playwright_fills_enable_synthetic(self):
+        for content in ('driver.find_element(By.ID, "email").send_keys("a@b.com")', 'await page.FILL("#email", "x")'):
+            intent = classify_intent(test_case_content=content)
+            assert "synthetic" in intent["operations"]
+
     def test_empty_input_returns_minimal_operations(self):
         intent = classify_intent()
         assert "operations" in intent
         assert isinstance(intent["operations"], list)
 
+    def test_repeat_calls_return_independent_copies(self):
+        first = classify_intent(connection_string="postgresql://localhost/db", config_flags={"operations": ["subset"]})
+        first["operations"].append("mutated")
+        second = classify_intent(connection_string="postgresql://localhost/db", config_flags={"operations": ["subset"]})
+        assert "mutated" not in second["operations"]
+
+    def test_cache_key_does_not_hold_content(self):
+        from services.decision_engine import _classify_intent_cached
+
+        classify_intent(test_case_content="fill email as a@example.com")
+        hits = _classify_intent_cached.cache_info().hits
+        intent = classify_intent(test_case_content="fill name as Bob\n" * 1000)
+        assert _classify_intent_cached.cache_info().hits == hits + 1
+        assert intent["preferred_synthetic_mode"] == "domain"
+
     def test_domain_fallback_when_no_schema(self):
         intent = classify_intent(domain="ecommerce", connection_string=None)
         assert intent.get("requires_domain_fallback") or "synthetic" in intent["operations"]
@@ -0,0 +1,46 @@
+"""Unit tests for the buffered JobLog writer."""
+import pytest
+from services.job_logs import JobLogBuffer
+
+
+class FakeSession:
+    def __init__(self):
+        self.rows = []
+        self.commits = 0
+
+    def add_all(self, rows):
+        self.rows.extend(rows)
+
+    def commit(self):
+        self.commits += 1
+
+
+class TestJobLogBuffer:
+    """Tests for JobLogBuffer batching."""
+
+    def test_batches_until_size_reached(self):
+        db = FakeSession()
+        logs = JobLogBuffer(db, "job-1", batch_size=3)
+        logs.log("a")
+        logs.log("b")
+        assert db.commits == 0
+        logs.log("c")
+        assert db.commits == 1
+        assert [r.message for r in db.rows] == ["a", "b", "c"]
+
+    def test_error_flushes_immediately(self):
+        db = FakeSession()
+        logs = JobLogBuffer(db, "job-1")
+        logs.log("starting")
+        logs.log("boom", "error")
+        assert db.commits == 1
+        assert [r.level for r in db.rows] == ["info", "error"]
+
+    def test_rows_keep_insertion_order_timestamps(self):
+        db = FakeSession()
+        logs = JobLogBuffer(db, "job-1")
+        for i in range(5):
+            logs.log(str(i))
+        logs.flush()
+        stamps = [r.created_at for r in db.rows]
+        assert stamps == sorted(stamps)
@@ -0,0 +1,68 @@
+"""Unit tests for masking transformers."""
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+import services.masking as masking
+from services.masking import TRANSFORMERS, _group_rules_by_table, _mask_one_file
+
+
+class TestTransformers:
+    """Column-level masking rules."""
+
+    def test_blank_values_are_preserved(self):
+        s = pa.chunked_array([["4111111111111111", "", None]])
+        for rule in ("mask.email_deterministic", "mask.hash", "mask.redact", "mask.fpe_pan"):
+            out = TRANSFORMERS[rule](s).to_pylist()
+            assert out[1] == ""
+            assert out[2] is None
+
+    def test_fpe_pan_keeps_first_and_last_four(self):
+        out = TRANSFORMERS["mask.fpe_pan"](pa.chunked_array([["4111-1111-1111-1234", "12"]]))
+        assert out.to_pylist() == ["4111-****-****-1234", "****"]
+
+    def test_hash_and_email_are_deterministic(self):
+        s = pa.chunked_array([["alice@example.com", "not-an-email"]])
+        assert TRANSFORMERS["mask.hash"](s).to_pylist() == TRANSFORMERS["mask.hash"](s).to_pylist()
+        emails = TRANSFORMERS["mask.email_deterministic"](s).to_pylist()
+        assert emails[0].endswith("@masked.local")
+        assert emails[1] == "***@***.***"
+
+    def test_redact_and_null(self):
+        s = pa.chunked_array([[7, 42, None]])
+        assert TRANSFORMERS["mask.redact"](s).to_pylist() == ["REDACTED", "REDACTED", None]
+        assert TRANSFORMERS["mask.null"](s).null_count == 3
+
+
+class TestMaskOneFile:
+    """Streaming a parquet file through the masking rules."""
+
+    def test_batches_match_whole_table(self, tmp_path, monkeypatch):
+        src = tmp_path / "users.parquet"
+        emails = [f"user{i}@example.com" if i % 3 else None for i in range(10)]
+        pq.write_table(pa.table({"email": emails, "age": list(range(10))}), src)
+        rules = _group_rules_by_table({"users.email": "mask.email_deterministic", "orders.age": "mask.null"})["users"]
+
+        monkeypatch.setattr(masking, "MASK_BATCH_SIZE", 4)
+        (tmp_path / "out").mkdir()
+        assert _mask_one_file((src, rules, tmp_path / "out")) == ("users", 10)
+
+        out = pq.read_table(tmp_path / "out" / "users.parquet")
+        expected = TRANSFORMERS["mask.email_deterministic"](pa.chunked_array([emails]))
+        assert out.column("email").to_pylist() == expected.to_pylist()
+        assert out.column("age").to_pylist() == list(range(10))
+
+    def test_empty_file_keeps_masked_schema(self, tmp_path):
+        src = tmp_path / "users.parquet"
+        pq.write_table(pa.table({"ssn": pa.array([], pa.int64())}), src)
+        (tmp_path / "out").mkdir()
+        assert _mask_one_file((src, [("ssn", "mask.redact")], tmp_path / "out")) == ("users", 0)
+        assert pq.read_table(tmp_path / "out" / "users.parquet").schema.field("ssn").type == pa.string()
+
+    def test_all_blank_columns_are_skipped(self, tmp_path):
+        src = tmp_path / "users.parquet"
+        pq.write_table(pa.table({"phone": pa.array([None, None], pa.int64()), "note": ["", ""]}), src)
+        (tmp_path / "out").mkdir()
+        _mask_one_file((src, [("phone", "mask.redact"), ("note", "mask.hash")], tmp_path / "out"))
+        out = pq.read_table(tmp_path / "out" / "users.parquet")
+        assert out.schema.field("phone").type == pa.int64()
+        assert out.column("note").to_pylist() == ["", ""]
@@ -0,0 +1,107 @@
+"""Unit tests for regex/name-based and LLM PII detection."""
+import json
+from types import SimpleNamespace
+
+import pytest
+import services.pii_detection as pii
+from services.pii_detection import _regex_detect
+
+
+class TestRegexDetect:
+    """Value-level PII detection."""
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            ("alice@example.com", "email"),
+            ("(555) 123-4567", "phone"),
+            # SSN/card strings also match phone; PATTERNS order decides, as with the per-pattern loop
+            ("123-45-6789", "phone"),
+            ("4111 1111 1111 1111", "phone"),
+        ],
+    )
+    def test_pattern_types(self, value, expected):
+        assert _regex_detect(f" {value} ") == (expected, 0.95)
+
+    def test_no_match(self):
+        assert _regex_detect("hello") is None
+        assert _regex_detect("") is None
+        assert _regex_detect(None) is None
+
+    def test_fallback_matcher_agrees(self, monkeypatch):
+        monkeypatch.setattr(pii, "RE2_AVAILABLE", False)
+        match = pii._compile_pattern_matcher()
+        for value in ("alice@example.com", "123-45-6789", "4111-1111-1111-1111", "hello"):
+            assert match(value) == pii._match_pattern(value)
+
+
+class TestNameHints:
+    """Column-name keyword hints."""
+
+    def test_first_hint_type_wins(self):
+        # "name" (person_name) occurs before "email" in the text, but email comes first in COLUMN_NAME_HINTS
+        assert pii._match_column_hint("username_email") == "email"
+        assert pii._match_column_hint("billing_city") == "address"
+        assert pii._match_column_hint("amount") is None
+
+    def test_value_hints_skip_pattern_types(self):
+        assert _regex_detect("Main Street") == ("address", 0.7)
+        assert _regex_detect("my email") is None
+
+    def test_fallback_matcher_agrees(self, monkeypatch):
+        monkeypatch.setattr(pii, "AHOCORASICK_AVAILABLE", False)
+        match = pii._compile_hint_matcher(pii.COLUMN_NAME_HINTS)
+        for name in ("username_email", "contact_number", "zip_code", "amount"):
+            assert match(name) == pii._match_column_hint(name)
+
+
+class TestLLMBatching:
+    """Batched, cached LLM classification."""
+
+    @pytest.fixture
+    def prompts(self, monkeypatch, tmp_path):
+        sent = []
+
+        class FakeCompletions:
+            def create(self, model, messages, temperature, response_format):
+                assert response_format == {"type": "json_object"}
+                sent.append(messages[0]["content"])
+                keys = [line[2:].split(":")[0] for line in messages[0]["content"].splitlines() if line.startswith("- ")]
+                content = json.dumps({k: {"pii_type": "none" if k.endswith("id") else "email", "confidence": 0.9} for k in keys})
+                return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+        class FakeClient:
+            def __init__(self, **kwargs):
+                self.chat = SimpleNamespace(completions=FakeCompletions())
+
+        cache = pii.PIILabelCache(str(tmp_path / "labels.sqlite"), ttl_seconds=60)
+        monkeypatch.setattr(pii, "AzureOpenAI", FakeClient)
+        monkeypatch.setattr(pii, "_llm_client", None)
+        monkeypatch.setattr(pii, "get_pii_label_cache", lambda: cache)
+        monkeypatch.setattr(pii.settings, "azure_api_key", "key")
+        monkeypatch.setattr(pii.settings, "azure_endpoint", "https://example.openai.azure.com/")
+        monkeypatch.setattr(pii, "LLM_CLASSIFY_BATCH_SIZE", 4)
+        return sent
+
+    def test_parse_batch_reply(self):
+        text = '{"users.email": {"pii_type": "email", "confidence": 0.9}, "users.id": {"pii_type": "none"}}'
+        assert pii._parse_llm_batch(text, ["users.email", "users.id", "users.name"]) == {
+            "users.email": ("email", 0.9),
+            "users.id": (None, 0.8),
+        }
+        assert pii._parse_llm_batch("not json", ["users.email"]) == {}
+        assert pii._parse_llm_batch('["users.email"]', ["users.email"]) == {}
+
+    def test_one_request_per_batch(self, prompts):
+        columns = [("t", f"c{i}", "varchar") for i in range(10)]
+        results = pii._llm_classify_columns(columns)
+        assert len(prompts) == 3
+        assert set(results) == {(table, col) for table, col, _ in columns}
+
+    def test_cached_labels_skip_the_llm(self, prompts):
+        pii._llm_classify_columns([("users", "email", "text"), ("users", "id", "int")])
+        assert len(prompts) == 1
+        # same names in another table/schema are answered from the cache, "none" included
+        results = pii._llm_classify_columns([("orders", "EMAIL", "text"), ("orders", "id", "int")])
+        assert len(prompts) == 1
+        assert results == {("orders", "EMAIL"): ("email", 0.9)}
@@ -0,0 +1,22 @@
+"""Unit tests for the COPY-based provisioning loader."""
+import pyarrow as pa
+import pytest
+from services.provisioning import _CSVReader, _csv_bytes
+
+
+class TestCopyCSV:
+    """CSV payloads handed to COPY ... FROM STDIN."""
+
+    def test_nulls_and_empty_strings_differ(self):
+        batch = pa.RecordBatch.from_pydict({"s": ["a", "", None], "n": [1, None, 3]})
+        assert _csv_bytes(batch) == b'"a",1\n"",\n,3\n'
+
+    def test_quotes_and_newlines_are_escaped(self):
+        batch = pa.RecordBatch.from_pydict({"s": ['say "hi",\nbye']})
+        assert _csv_bytes(batch) == b'"say ""hi"",\nbye"\n'
+
+    def test_reader_concatenates_chunks(self):
+        reader = _CSVReader([b"ab", b"cde", b"f"])
+        assert reader.read(4) == b"abcd"
+        assert reader.read() == b"ef"
+        assert reader.read(8) == b""
@@ -0,0 +1,55 @@
+"""Unit tests for the synthetic quality engine."""
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from services.quality_engine import _null_ratio_check, _parquet_null_ratio
+
+
+class TestNullRatio:
+    """Null ratio from parquet statistics."""
+
+    def test_matches_dataframe_ratio(self, tmp_path):
+        df = pd.DataFrame({"a": [1, None, 3, None], "b": ["x", None, None, None]}, index=[4, 5, 6, 7])
+        df.to_parquet(tmp_path / "t.parquet", row_group_size=2)
+        ratio = _parquet_null_ratio(pq.ParquetFile(tmp_path / "t.parquet"))
+        assert ratio == df.isnull().sum().sum() / df.size
+        assert _null_ratio_check(tmp_path / "t.parquet") == "warning"
+
+    def test_missing_statistics_fall_back_to_scan(self, tmp_path):
+        pq.write_table(pa.table({"a": [1.0, None, float("nan")], "b": ["x", "y", "z"]}), tmp_path / "t.parquet", write_statistics=False)
+        assert _parquet_null_ratio(pq.ParquetFile(tmp_path / "t.parquet")) is None
+        assert _null_ratio_check(tmp_path / "t.parquet") == "ok"
+        pq.write_table(pa.table({"a": [None, None, 1.0]}), tmp_path / "t.parquet", write_statistics=False)
+        assert _null_ratio_check(tmp_path / "t.parquet") == "warning"
+
+
+class TestDistributionMetrics:
+    """Drift and KL divergence."""
+
+    def test_drift_is_half_l1_distance(self):
+        from services.quality_engine import detect_drift
+        assert detect_drift({"a": 0.5, "b": 0.5}, {"a": 0.5, "b": 0.5}) == 0.0
+        assert detect_drift({"a": 0.7, "b": 0.3}, {"a": 0.5, "c": 0.5}) == pytest.approx(0.5)
+        assert detect_drift({}, {"a": 1.0}) == 0.0
+
+    def test_kl_divergence(self):
+        import numpy as np
+        from services.quality_engine import _safe_kl_divergence
+        assert _safe_kl_divergence([1, 1], [1, 1]) == pytest.approx(0.0)
+        p, q = np.array([0.9, 0.1]), np.array([0.5, 0.5])
+        expected = 0.9 * np.log(0.9 / 0.5) + 0.1 * np.log(0.1 / 0.5)
+        assert _safe_kl_divergence(p, q) == pytest.approx(expected, rel=1e-6)
+        assert list(p) == [0.9, 0.1]
+
+    def test_correlation_similarity_matches_pandas(self):
+        import numpy as np
+        from services.quality_engine import _correlation_similarity
+        rng = np.random.default_rng(0)
+        df1 = pd.DataFrame(rng.normal(size=(500, 4)), columns=list("abcd"))
+        df2 = df1.copy()
+        df2["b"] = df2["a"] * 2 + rng.normal(size=500)
+        df1["d"] = 1.0
+        expected = 1 - np.abs(df1.corr().fillna(0).values - df2.corr().fillna(0).values).mean()
+        assert _correlation_similarity(df1, df2, list("abcd")) == pytest.approx(expected, abs=1e-5)
+        assert _correlation_similarity(df1, df1, list("abcd")) == pytest.approx(1.0)
@@ -0,0 +1,36 @@
+"""Unit tests for schema fusion."""
+import pytest
+from services.schema_fusion import fuse_schemas, match_fields
+
+
+class TestMatchFields:
+    """Tests for cross-source field matching."""
+
+    def test_exact_match_stops_the_scan(self):
+        a = [{"name": "Email"}]
+        b = [{"name": "user_email"}, {"name": "email"}, {"name": "email_verified"}]
+        matches = match_fields(a, b)
+        assert [(m["field_b"]["name"], m["score"]) for m in matches] == [("user_email", 0.7), ("email", 1.0)]
+
+    def test_substring_matches_both_directions(self):
+        matches = match_fields([{"name": "phone_number"}, {"name": "id"}], [{"name": "phone"}, {"name": "user_id"}])
+        assert [(m["field_a"]["name"], m["field_b"]["name"]) for m in matches] == [
+            ("phone_number", "phone"),
+            ("id", "user_id"),
+        ]
+
+    def test_unrelated_names_do_not_match(self):
+        assert match_fields([{"name": "city"}], [{"name": "zip"}]) == []
+
+
+class TestFuseSchemas:
+    """Tests for weighted schema fusion."""
+
+    def test_fields_are_deduplicated_across_sources(self):
+        db = {"tables": [{"name": "users", "columns": [{"name": "id", "type": "integer"}, {"name": "email"}]}]}
+        ui = {"entities": {"users": {"fields": {"email": {}, "phone": {}}}}}
+        unified = fuse_schemas(db_schema=db, ui_schema=ui)
+        (users,) = unified["tables"]
+        assert [f["name"] for f in users["fields"]] == ["id", "email", "phone"]
+        assert users["sources"] == ["db", "ui"]
+        assert "_field_names" not in users
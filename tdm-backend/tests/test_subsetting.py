@@ -0,0 +1,56 @@
+"""Unit tests for subset extraction helpers."""
+import uuid
+from concurrent.futures import Future
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from services.subsetting import _extract_child, _to_arrow, _write_tables
+
+
+class TestToArrow:
+    """DataFrame -> Arrow conversion before parquet writes."""
+
+    def test_object_columns_are_stringified_and_nulls_kept(self):
+        uid = uuid.uuid4()
+        df = pd.DataFrame({"id": pd.Series([uid, None], dtype=object), "qty": [1, 2]})
+        table = _to_arrow(df)
+        assert table.column("id").to_pylist() == [str(uid), None]
+        assert table.column("qty").to_pylist() == [1, 2]
+        assert df["id"].iloc[0] is uid
+
+    def test_empty_frame(self):
+        assert _to_arrow(pd.DataFrame()).num_rows == 0
+
+
+class TestWriteTables:
+    """Concurrent parquet output."""
+
+    def test_every_table_is_written(self, tmp_path):
+        tables = {f"t{i}": pa.table({"id": list(range(i + 1))}) for i in range(5)}
+        _write_tables(tables, tmp_path)
+        for name, table in tables.items():
+            assert pq.read_table(tmp_path / f"{name}.parquet").equals(table)
+
+    def test_write_failure_is_raised(self, tmp_path):
+        with pytest.raises(OSError):
+            _write_tables({"t": pa.table({"id": [1]})}, tmp_path / "missing")
+
+
+class TestExtractChild:
+    """FK-driven child extraction."""
+
+    @staticmethod
+    def _done(result):
+        f = Future()
+        f.set_result(result)
+        return f
+
+    def test_skipped_when_parent_was_not_extracted(self):
+        assert _extract_child(None, "public", "orders", "user_id", self._done((None, None)), "id", 10) == (None, None)
+
+    def test_empty_frame_when_parent_has_no_keys(self):
+        parent = pa.table({"id": pa.array([None], pa.int64())})
+        table, msg = _extract_child(None, "public", "orders", "user_id", self._done((parent, None)), "id", 10)
+        assert table.num_rows == 0 and msg is None
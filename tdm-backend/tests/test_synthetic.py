@@ -0,0 +1,56 @@
+"""Unit tests for schema-driven synthetic generation."""
+import re
+
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+from services.synthetic import _fake_column, _generate_and_write, _pk_column
+
+
+class TestFakeColumn:
+    """Column-at-a-time value generation."""
+
+    def test_numeric_columns_are_typed_arrays(self):
+        ints = _fake_column("qty", "INTEGER", "", 100)
+        assert ints.dtype == np.int64
+        assert ints.min() >= 1 and ints.max() <= 1_000_000
+        assert _fake_column("active", "BOOLEAN", "", 100).dtype == bool
+
+    def test_dates_are_iso_strings(self):
+        days = _fake_column("created", "", "date", 20)
+        assert all(re.fullmatch(r"\d{4}-\d{2}-\d{2}", d) for d in days)
+        stamps = _fake_column("ts", "TIMESTAMP", "", 20)
+        assert all(re.fullmatch(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}", s) for s in stamps)
+
+    def test_uuids_are_unique(self):
+        ids = _fake_column("id", "UUID", "", 1000)
+        assert len(set(ids)) == 1000
+
+    def test_string_columns_sample_from_faker_pool(self):
+        emails = _fake_column("contact", "VARCHAR", "email", 500)
+        assert len(emails) == 500
+        assert all("@" in e for e in emails)
+        assert len(_fake_column("note", "TEXT", "", 0)) == 0
+
+
+class TestPkColumn:
+    """Primary key selection for generated tables."""
+
+    def test_last_integer_id_column_wins(self):
+        cols = [("id", "INTEGER", None), ("name", "VARCHAR", None), ("order_id", "BIGINT", None)]
+        assert _pk_column(cols) == "order_id"
+
+    def test_falls_back_to_first_column(self):
+        assert _pk_column([("code", "UUID", None), ("label", "TEXT", None)]) == "code"
+
+
+class TestGenerateAndWrite:
+    """Per-table worker entry point."""
+
+    def test_writes_parquet_with_sequential_keys(self, tmp_path):
+        cols = [("id", "INTEGER", None), ("email", "VARCHAR", "email")]
+        fp = tmp_path / "users.parquet"
+        assert _generate_and_write(("users", cols, 25, fp)) == ("users", 25, "id")
+        out = pq.read_table(fp)
+        assert out.column("id").to_pylist() == list(range(1, 26))
+        assert all("@" in e for e in out.column("email").to_pylist())
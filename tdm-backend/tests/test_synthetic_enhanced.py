@@ -1,4 +1,6 @@
 """Unit tests for synthetic data generation."""
+import re
+
 import pytest
 from services.synthetic_enhanced import SyntheticDataGenerator
 
@@ -50,3 +52,98 @@ class TestParseTestCaseContent:
         schema = self.gen._parse_test_case_content(content)
         assert schema.get("has_form_fields") is True
         assert "checkout" in schema.get("entities", {})
+
+
+class TestInferFieldType:
+    """Tests for _infer_field_type."""
+
+    def setup_method(self):
+        self.gen = SyntheticDataGenerator()
+
+    def test_earlier_rules_win(self):
+        assert self.gen._infer_field_type("user_first_name") == "name"
+        assert self.gen._infer_field_type("first_name") == "first_name"
+        assert self.gen._infer_field_type("Email_Address") == "email"
+        assert self.gen._infer_field_type("card_number") == "credit_card"
+        assert self.gen._infer_field_type("card_holder") == "string"
+
+    def test_sample_value_fallback(self):
+        assert self.gen._infer_field_type("contact", "555-123-4567") == "phone"
+        assert self.gen._infer_field_type("when", "2024-01-01") == "date"
+        assert self.gen._infer_field_type("note", "hello") == "string"
+
+
+class TestCompileGenerator:
+    """Tests for _compile_generator."""
+
+    def setup_method(self):
+        self.gen = SyntheticDataGenerator()
+
+    def test_numeric_columns_keep_scalar_ranges(self):
+        prices = self.gen._compile_generator("price", "number")(200)
+        assert len(prices) == 200
+        assert prices.min() >= 10 and prices.max() <= 1000
+        ids = self.gen._compile_generator("user_id", "integer")(200)
+        assert ids.min() >= 1 and ids.max() <= 100000
+        assert self.gen._compile_generator("active", "boolean")(10).dtype == bool
+
+    def test_dates_are_iso_strings(self):
+        dates = self.gen._compile_generator("dob", "date")(20).to_pylist()
+        assert all(re.fullmatch(r"\d{4}-\d{2}-\d{2}", d) for d in dates)
+        stamps = self.gen._compile_generator("seen", "datetime")(20).to_pylist()
+        assert all(re.fullmatch(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}", s) for s in stamps)
+
+    def test_string_columns(self):
+        emails = self.gen._compile_generator("contact_email", "string")(50).to_pylist()
+        assert len(emails) == 50 and all("@" in e for e in emails)
+        addresses = self.gen._compile_generator("address", "address")(50).to_pylist()
+        assert not any("\n" in a for a in addresses)
+
+
+class TestGenerateEntities:
+    """Tests for _generate_entities."""
+
+    def test_writes_entities_with_fields_in_order(self, tmp_path):
+        import pyarrow.parquet as pq
+
+        gen = SyntheticDataGenerator()
+        entities = {
+            "customer": {"fields": {"email": {"type": "email"}, "age": {"type": "integer"}}},
+            "empty": {"fields": {}},
+            "order": {"fields": {"total_amount": {"type": "number"}}},
+        }
+        result = gen._generate_entities(entities, {"order": 3}, 5, tmp_path)
+        assert result == [("customer", 5), ("order", 3)]
+        assert pq.read_table(tmp_path / "customer.parquet").column_names == ["email", "age"]
+        assert not (tmp_path / "empty.parquet").exists()
+
+    def test_rows_are_streamed_in_row_groups(self, tmp_path, monkeypatch):
+        import dataset_store
+        import pyarrow.parquet as pq
+
+        monkeypatch.setattr(dataset_store, "PARQUET_ROW_GROUP_SIZE", 4)
+        gen = SyntheticDataGenerator()
+        fields = {"email": {"type": "email"}, "total_amount": {"type": "number"}, "dob": {"type": "date"}}
+        assert gen._write_entity("customer", fields, 10, tmp_path / "customer.parquet") == ("customer", 10)
+        pf = pq.ParquetFile(tmp_path / "customer.parquet")
+        assert pf.metadata.num_rows == 10
+        assert pf.metadata.num_row_groups == 3
+
+        gen._write_entity("none", fields, 0, tmp_path / "none.parquet")
+        assert pq.read_table(tmp_path / "none.parquet").column_names == ["email", "total_amount", "dob"]
+
+    def test_failing_field_falls_back_for_every_row_group(self, tmp_path, monkeypatch):
+        import dataset_store
+        import pyarrow.parquet as pq
+
+        monkeypatch.setattr(dataset_store, "PARQUET_ROW_GROUP_SIZE", 4)
+        gen = SyntheticDataGenerator()
+
+        def broken(n):
+            raise ValueError("no provider")
+
+        compile_generator = gen._compile_generator
+        monkeypatch.setattr(gen, "_compile_generator", lambda name, ft: broken if name == "bad" else compile_generator(name, ft))
+        gen._write_entity("t", {"bad": {"type": "string"}, "qty": {"type": "integer"}}, 10, tmp_path / "t.parquet")
+        out = pq.read_table(tmp_path / "t.parquet")
+        assert out.column("bad").to_pylist() == ["value"] * 10
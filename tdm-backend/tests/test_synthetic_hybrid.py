@@ -0,0 +1,52 @@
+"""Unit tests for the hybrid rule-based generator."""
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from services.synthetic_enhanced import SyntheticDataGenerator
+from services.synthetic_hybrid import apply_rule_constraints, generate_with_rules
+
+
+class TestApplyRuleConstraints:
+    """Column-wise rule application."""
+
+    def test_equality_and_predicate_rules(self):
+        df = pd.DataFrame({"country": ["in", "US", "FR"], "age": [10, 70, 30]})
+        out = apply_rule_constraints(df, "user")
+        assert out["currency"].tolist() == ["INR", "USD", None]
+        assert out["pincode_format"].tolist() == ["6digit", "zip5", None]
+        assert out["account_status"].tolist() == ["minor", "senior", None]
+
+    def test_existing_values_are_kept(self):
+        df = pd.DataFrame({"country": ["IN", "IN"], "currency": ["EUR", None]})
+        assert apply_rule_constraints(df, "user")["currency"].tolist() == ["EUR", "INR"]
+
+    def test_frames_without_condition_columns_are_untouched(self):
+        df = pd.DataFrame({"email": ["a@b.c"]})
+        assert apply_rule_constraints(df, "user").columns.tolist() == ["email"]
+
+
+class TestGenerateWithRules:
+    """End-to-end rule-based generation."""
+
+    def test_writes_one_file_per_entity(self, tmp_path):
+        schema = {
+            "entities": {
+                "user": {"fields": {"country": {"type": "string"}, "age": {"type": "integer"}}},
+                "empty": {"fields": {}},
+            }
+        }
+        assert generate_with_rules(SyntheticDataGenerator(), schema, {"*": 20}, tmp_path) == {"user": 20}
+        table = pq.read_table(tmp_path / "user.parquet")
+        assert table.num_rows == 20
+        assert "account_status" in table.column_names
+
+    def test_row_groups_share_one_schema(self, tmp_path, monkeypatch):
+        import dataset_store
+
+        monkeypatch.setattr(dataset_store, "PARQUET_ROW_GROUP_SIZE", 3)
+        schema = {"entities": {"user": {"fields": {"country": {"type": "string"}, "age": {"type": "integer"}}}}}
+        generate_with_rules(SyntheticDataGenerator(), schema, {"*": 10}, tmp_path)
+        pf = pq.ParquetFile(tmp_path / "user.parquet")
+        assert pf.metadata.num_row_groups == 4
+        assert pf.schema_arrow.names == ["country", "age", "currency", "pincode_format", "account_status"]
+        assert pf.read().num_rows == 10